@@ -0,0 +1,112 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import os
+import json
+from absl import app, flags
+import cv2
+import numpy as np
+import multiprocessing as _mp
+from src.capture import ReplayCapture
+from src.detector import HandDetector
+from src.actions import game_actions
+from src.utils import predict_array
+
+flags.DEFINE_string("input", None, "Path to a video, a directory of frames or a recording made with --record")
+flags.DEFINE_string("output", "annotations.jsonl", "Path to the output file, one JSON object per frame")
+flags.DEFINE_integer("width", 640, "Frame width")
+flags.DEFINE_integer("height", 480, "Frame height")
+flags.DEFINE_float("threshold", 0.6, "Threshold for score")
+flags.DEFINE_integer("batch_size", 16, "Number of frames per inference call")
+flags.DEFINE_integer("workers", 2, "Number of processes, each one loads its own copy of the model")
+flags.DEFINE_integer("shard_size", 1000, "Number of frames handled by a worker at a time")
+flags.DEFINE_integer("top_k", 2, "Number of detections written per frame")
+flags.DEFINE_boolean("flip", True, "Mirror frames like the game scripts do with the webcam")
+flags.DEFINE_string("pre_trained_model_path", "src/pretrained_model.pb", "Path to pre-trained model")
+
+FLAGS = flags.FLAGS
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+detector = None
+
+
+def init_worker(path):
+    global detector
+    detector = HandDetector(path)
+
+
+def read_frames(source, start, end, width, height, flip):
+    if isinstance(source, list):
+        frames = (cv2.imread(path) for path in source[start:end])
+    elif os.path.isdir(source):
+        frames = ReplayCapture(source, realtime=False).frames[start:end]
+    else:
+        cap = cv2.VideoCapture(source)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        frames = (cap.read()[1] for _ in range(start, end))
+    for frame in frames:
+        if frame is None:
+            break
+        if frame.shape[:2] != (height, width):
+            frame = cv2.resize(frame, (width, height))
+        if flip:
+            frame = cv2.flip(frame, 1)
+        yield cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def annotate(boxes, scores, classes, threshold, width, height, top_k):
+    actions = game_actions(predict_array(boxes, scores, classes, threshold, width, height), width, height)
+    return {"boxes": boxes[:top_k].tolist(), "scores": scores[:top_k].tolist(),
+            "classes": classes[:top_k].astype(int).tolist(), "actions": actions}
+
+
+def process_shard(args):
+    source, start, end, batch_size, threshold, width, height, top_k, flip = args
+    records = []
+    batch = []
+    for frame in read_frames(source, start, end, width, height, flip):
+        batch.append(frame)
+        if len(batch) == batch_size:
+            records.extend(process_batch(batch, threshold, width, height, top_k))
+            batch = []
+    if batch:
+        records.extend(process_batch(batch, threshold, width, height, top_k))
+    return [dict(frame=start + index, **record) for index, record in enumerate(records)]
+
+
+def process_batch(batch, threshold, width, height, top_k):
+    all_boxes, all_scores, all_classes = detector.detect_batch(np.stack(batch))
+    return [annotate(boxes, scores, classes, threshold, width, height, top_k)
+            for boxes, scores, classes in zip(all_boxes, all_scores, all_classes)]
+
+
+def main(_):
+    if FLAGS.input is None:
+        raise ValueError("--input is required")
+    if os.path.isfile(os.path.join(FLAGS.input, "timestamps.npy")):
+        source = FLAGS.input
+        num_frames = int(ReplayCapture(source).get(cv2.CAP_PROP_FRAME_COUNT))
+    elif os.path.isdir(FLAGS.input):
+        source = sorted(os.path.join(FLAGS.input, name) for name in os.listdir(FLAGS.input)
+                        if name.lower().endswith(IMAGE_EXTENSIONS))
+        num_frames = len(source)
+    else:
+        source = FLAGS.input
+        cap = cv2.VideoCapture(source)
+        num_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+    shards = [(source, start, min(start + FLAGS.shard_size, num_frames), FLAGS.batch_size, FLAGS.threshold,
+               FLAGS.width, FLAGS.height, FLAGS.top_k, FLAGS.flip)
+              for start in range(0, num_frames, FLAGS.shard_size)]
+    mp = _mp.get_context("spawn")
+    with mp.Pool(FLAGS.workers, initializer=init_worker, initargs=(FLAGS.pre_trained_model_path,)) as pool, \
+            open(FLAGS.output, "w") as f:
+        for records in pool.imap(process_shard, shards):
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            print("Annotated {}/{} frames".format(records[-1]["frame"] + 1 if records else 0, num_frames))
+
+
+if __name__ == '__main__':
+    app.run(main)
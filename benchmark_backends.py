@@ -0,0 +1,55 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+from absl import app, flags
+import numpy as np
+from src.benchmark import replay_detections, action_agreements
+from src.detector import HandDetector
+from src.actions import game_actions
+
+flags.DEFINE_string("replay", None, "Directory of a recording made with --record")
+flags.DEFINE_list("models", ["tensorflow=src/pretrained_model.pb", "opencv=src/pretrained_model.pb",
+                             "onnx=src/pretrained_model.onnx", "tflite=src/pretrained_model.tflite"],
+                  "Backends to compare as BACKEND=MODEL_PATH, the first one is the reference")
+flags.DEFINE_integer("width", 640, "Frame width")
+flags.DEFINE_integer("height", 480, "Frame height")
+flags.DEFINE_float("threshold", 0.6, "Threshold for score")
+flags.DEFINE_integer("max_frames", 0, "Number of frames to use, 0 for the whole recording")
+
+FLAGS = flags.FLAGS
+
+
+def run(backend, path):
+    detector = HandDetector(path, backend=backend)
+    latencies, hands = replay_detections(detector, FLAGS.replay, FLAGS.width, FLAGS.height, FLAGS.threshold,
+                                         FLAGS.max_frames)
+    detector.close()
+    return latencies, [game_actions(frame_hands, FLAGS.width, FLAGS.height) for frame_hands in hands]
+
+
+def main(_):
+    if FLAGS.replay is None:
+        raise ValueError("--replay is required")
+    models = [model.split("=", 1) for model in FLAGS.models]
+    reference_actions = None
+    games = None
+    for backend, path in models:
+        try:
+            latencies, actions = run(backend, path)
+        except Exception as error:
+            # Backends are optional, a missing runtime or model only removes that row
+            print("{:>10} skipped: {}".format(backend, error))
+            continue
+        if reference_actions is None:
+            reference_actions = actions
+            games = list(actions[0])
+            print("Latency of a detection and share of frames whose game action matches the {} one".format(backend))
+            print("{:>10} {:>10} {:>10} {}".format("backend", "mean ms", "p95 ms",
+                                                   " ".join("{:>12}".format(game) for game in games)))
+        agreements = action_agreements(actions, reference_actions, games)
+        print("{:>10} {:>10.1f} {:>10.1f} {}".format(backend, latencies.mean(), np.percentile(latencies, 95),
+                                                     " ".join("{:>12.1%}".format(value) for value in agreements)))
+
+
+if __name__ == '__main__':
+    app.run(main)
@@ -0,0 +1,51 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+from absl import app, flags
+import numpy as np
+from src.benchmark import replay_detections, action_agreements
+from src.detector import HandDetector, INTERPOLATIONS
+from src.actions import game_actions
+
+flags.DEFINE_string("replay", None, "Directory of a recording made with --record")
+flags.DEFINE_list("resolutions", ["480x360", "320x240", "256x192", "160x120"],
+                  "Detector input resolutions to compare with the full frame, as WIDTHxHEIGHT")
+flags.DEFINE_enum("interpolation", "area", list(INTERPOLATIONS), "Interpolation used for downscaling")
+flags.DEFINE_integer("width", 640, "Frame width")
+flags.DEFINE_integer("height", 480, "Frame height")
+flags.DEFINE_float("threshold", 0.6, "Threshold for score")
+flags.DEFINE_integer("max_frames", 0, "Number of frames to use, 0 for the whole recording")
+flags.DEFINE_string("pre_trained_model_path", "src/pretrained_model.pb", "Path to pre-trained model")
+
+FLAGS = flags.FLAGS
+
+
+def run(input_size):
+    detector = HandDetector(FLAGS.pre_trained_model_path, input_size, FLAGS.interpolation)
+    latencies, hands = replay_detections(detector, FLAGS.replay, FLAGS.width, FLAGS.height, FLAGS.threshold,
+                                         FLAGS.max_frames)
+    detector.close()
+    return latencies, [game_actions(frame_hands, FLAGS.width, FLAGS.height) for frame_hands in hands]
+
+
+def main(_):
+    if FLAGS.replay is None:
+        raise ValueError("--replay is required")
+    reference_latencies, reference_actions = run(None)
+    games = list(reference_actions[0])
+    print("Latency of a detection and share of frames whose game action matches the full resolution one")
+    print("{:>10} {:>10} {:>10} {}".format("resolution", "mean ms", "p95 ms",
+                                           " ".join("{:>12}".format(game) for game in games)))
+    print("{:>10} {:>10.1f} {:>10.1f} {}".format("full", reference_latencies.mean(),
+                                                 np.percentile(reference_latencies, 95),
+                                                 " ".join("{:>12.1%}".format(1) for _ in games)))
+    for resolution in FLAGS.resolutions:
+        width, height = (int(value) for value in resolution.split("x"))
+        latencies, actions = run((width, height))
+        agreements = action_agreements(actions, reference_actions, games)
+        print("{:>10} {:>10.1f} {:>10.1f} {}".format(resolution, latencies.mean(), np.percentile(latencies, 95),
+                                                     " ".join("{:>12.1%}".format(value) for value in agreements)))
+
+
+if __name__ == '__main__':
+    app.run(main)
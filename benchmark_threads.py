@@ -0,0 +1,78 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import itertools
+import time
+from absl import app, flags
+import numpy as np
+import multiprocessing as _mp
+from src.capture import read_recording
+from src.cpu import parse_cpus, set_affinity, set_cv_threads
+from src.detector import HandDetector
+from src.preprocess import FramePreprocessor
+
+flags.DEFINE_string("replay", None, "Recording used for the measurement, random frames are used without it")
+flags.DEFINE_integer("max_frames", 200, "Number of frames measured for every setting")
+flags.DEFINE_list("intra_op_threads", ["0", "1", "2", "4"], "TensorFlow intra-op thread counts to try")
+flags.DEFINE_list("inter_op_threads", ["0", "1", "2"], "TensorFlow inter-op thread counts to try")
+flags.DEFINE_list("cv_threads", ["-1", "0", "1"], "OpenCV thread counts to try")
+flags.DEFINE_string("cpus", "", "CPUs left for detection, like 0-2, to account for the cores given to the game")
+flags.DEFINE_integer("width", 640, "Frame width")
+flags.DEFINE_integer("height", 480, "Frame height")
+flags.DEFINE_string("pre_trained_model_path", "src/pretrained_model.pb", "Path to pre-trained model")
+
+FLAGS = flags.FLAGS
+
+
+def read_frames(replay, max_frames, width, height):
+    if replay is None:
+        random = np.random.RandomState(0)
+        return [random.randint(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(max_frames)]
+    return list(read_recording(replay, width, height, max_frames))
+
+
+def measure(setting, cpus, replay, max_frames, width, height, path):
+    # Runs in a fresh process for every setting, thread pools and affinity are per process
+    intra_op_threads, inter_op_threads, cv_threads = setting
+    set_affinity(cpus)
+    set_cv_threads(cv_threads)
+    frames = read_frames(replay, max_frames, width, height)
+    detector = HandDetector(path, intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads)
+    detector.warmup(width, height)
+    preprocessor = FramePreprocessor()
+    latencies = []
+    for frame in frames:
+        # Same work as the game scripts do on every frame before drawing, without tracking
+        start = time.time()
+        _, rgb = preprocessor.process(frame)
+        detector.detect(rgb)
+        latencies.append(time.time() - start)
+    detector.close()
+    return np.array(latencies) * 1000
+
+
+def main(_):
+    mp = _mp.get_context("spawn")
+    cpus = parse_cpus(FLAGS.cpus)
+    settings = list(itertools.product(*([int(value) for value in values] for values in (
+        FLAGS.intra_op_threads, FLAGS.inter_op_threads, FLAGS.cv_threads))))
+    results = []
+    for setting in settings:
+        with mp.Pool(1) as pool:
+            latencies = pool.apply(measure, (setting, cpus, FLAGS.replay, FLAGS.max_frames, FLAGS.width,
+                                             FLAGS.height, FLAGS.pre_trained_model_path))
+        results.append((np.percentile(latencies, 95), latencies.mean(), latencies.std(), setting))
+        print("Measured intra {} inter {} cv {}".format(*setting))
+    # Ranked by p95 rather than by mean, a steady frame time matters more to the games than a low average
+    results.sort()
+    print("{:>6} {:>6} {:>6} {:>10} {:>10} {:>10}".format("intra", "inter", "cv", "mean ms", "p95 ms", "std ms"))
+    for p95, mean, std, (intra_op_threads, inter_op_threads, cv_threads) in results:
+        print("{:>6} {:>6} {:>6} {:>10.1f} {:>10.1f} {:>10.1f}".format(intra_op_threads, inter_op_threads,
+                                                                       cv_threads, mean, p95, std))
+    intra_op_threads, inter_op_threads, cv_threads = results[0][3]
+    print("Best setting: --intra_op_threads {} --inter_op_threads {} --cv_threads {}{}".format(
+        intra_op_threads, inter_op_threads, cv_threads, " --main_cpus " + FLAGS.cpus if FLAGS.cpus else ""))
+
+
+if __name__ == '__main__':
+    app.run(main)
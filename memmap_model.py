@@ -0,0 +1,128 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import os
+import time
+import tensorflow as tf
+from absl import app, flags
+import numpy as np
+import multiprocessing as _mp
+from src.detector import HandDetector
+from src.utils import MEMMAPPED_GRAPH, read_graph_def, write_graph_def
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+flags.DEFINE_string("pre_trained_model_path", "src/pretrained_model.pb", "Path to pre-trained model")
+flags.DEFINE_string("output", "src/memmapped_model", "Directory to write the memory-mapped model to")
+flags.DEFINE_integer("min_bytes", 1024, "Constants smaller than this stay inside the graph")
+flags.DEFINE_integer("processes", 2, "Number of processes loading the same model at once during the measurement")
+flags.DEFINE_integer("width", 640, "Frame width")
+flags.DEFINE_integer("height", 480, "Frame height")
+
+FLAGS = flags.FLAGS
+
+WEIGHTS_DIR = "weights"
+
+
+def convert(graph_def, output, min_bytes):
+    """ Move every large constant of the graph into its own raw file, read through an ImmutableConst node
+    TensorFlow maps these files instead of copying them, so weights are paged in on first use and the pages are
+    shared by every process loading the same model.
+    @return number of constants moved out and their total size in bytes
+    """
+    os.makedirs(os.path.join(output, WEIGHTS_DIR), exist_ok=True)
+    count = 0
+    total = 0
+    for node in graph_def.node:
+        if node.op != "Const" or node.attr["value"].tensor.dtype == tf.string.as_datatype_enum:
+            continue
+        array = tf.make_ndarray(node.attr["value"].tensor)
+        if array.nbytes < min_bytes:
+            continue
+        region = "{}/{:04d}.bin".format(WEIGHTS_DIR, count)
+        # Each file is mapped from its start, which keeps the data aligned the way ImmutableConst requires
+        np.ascontiguousarray(array).tofile(os.path.join(output, region))
+        node.op = "ImmutableConst"
+        del node.attr["value"]
+        node.attr["shape"].shape.CopyFrom(tf.TensorShape(array.shape).as_proto())
+        node.attr["memory_region_name"].s = region.encode()
+        count += 1
+        total += array.nbytes
+    write_graph_def(graph_def, os.path.join(output, MEMMAPPED_GRAPH))
+    return count, total
+
+
+def memory_usage():
+    """ Resident, proportional and private memory of the current process in MB
+    Proportional memory splits shared pages evenly between the processes mapping them. Outside Linux, only the
+    peak resident memory is known.
+    """
+    usage = {"rss": float("nan"), "pss": float("nan"), "private": float("nan")}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line and not line.startswith(" "))
+    except OSError:
+        if resource is not None:
+            usage["rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return usage
+    kilobytes = {key: int(value.split()[0]) for key, value in fields.items() if value.strip().endswith("kB")}
+    usage["rss"] = kilobytes.get("Rss", 0) / 1024
+    usage["pss"] = kilobytes.get("Pss", 0) / 1024
+    usage["private"] = (kilobytes.get("Private_Clean", 0) + kilobytes.get("Private_Dirty", 0)) / 1024
+    return usage
+
+
+def measure(path, frame, barrier, results):
+    start = time.time()
+    detector = HandDetector(path)
+    load_time = time.time() - start
+    start = time.time()
+    outputs = detector.detect(frame)
+    first_run = time.time() - start
+    # Memory is read while every process holds its model, so that shared pages show up as such
+    barrier.wait()
+    results.put((load_time, first_run, memory_usage(), outputs))
+    barrier.wait()
+    detector.close()
+
+
+def run(mp, path, frame, processes):
+    barrier = mp.Barrier(processes)
+    results = mp.Queue()
+    workers = [mp.Process(target=measure, args=(path, frame, barrier, results)) for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    measurements = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return measurements
+
+
+def main(_):
+    count, total = convert(read_graph_def(FLAGS.pre_trained_model_path), FLAGS.output, FLAGS.min_bytes)
+    print("Wrote {} with {} constants ({:.1f} MB) memory mapped".format(FLAGS.output, count, total / 1024 ** 2))
+
+    mp = _mp.get_context("spawn")
+    frame = np.random.randint(0, 256, (FLAGS.height, FLAGS.width, 3), dtype=np.uint8)
+    print("Mean over {} processes loading the model at once".format(FLAGS.processes))
+    print("{:>30} {:>8} {:>13} {:>8} {:>8} {:>11}".format("model", "load s", "first run ms", "RSS MB", "PSS MB",
+                                                          "private MB"))
+    outputs = []
+    for path in (FLAGS.pre_trained_model_path, FLAGS.output):
+        measurements = run(mp, path, frame, FLAGS.processes)
+        load_times, first_runs, usages, model_outputs = zip(*measurements)
+        print("{:>30} {:>8.2f} {:>13.1f} {:>8.1f} {:>8.1f} {:>11.1f}".format(
+            path, np.mean(load_times), np.mean(first_runs) * 1000,
+            *(np.mean([usage[key] for usage in usages]) for key in ("rss", "pss", "private"))))
+        outputs.append(model_outputs[0])
+    max_diff = max(np.abs(original - memmapped).max() for original, memmapped in zip(*outputs))
+    if max_diff:
+        raise SystemExit("Outputs differ from the original model by up to {:.2e}".format(max_diff))
+    print("Outputs match the original model")
+
+
+if __name__ == '__main__':
+    app.run(main)
@@ -0,0 +1,94 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import time
+import tensorflow as tf
+from absl import app, flags
+import numpy as np
+from tensorflow.tools.graph_transforms import TransformGraph
+from src.capture import iterate_recording
+from src.detector import HandDetector
+from src.utils import DETECTION_OUTPUTS, read_graph_def, write_graph_def
+
+flags.DEFINE_string("pre_trained_model_path", "src/pretrained_model.pb", "Path to pre-trained model")
+flags.DEFINE_string("output", "src/optimized_model.pb", "Path to write the optimized model to")
+flags.DEFINE_integer("top_k", 10, "Number of detections kept in the outputs")
+flags.DEFINE_string("replay", None, "Recording used to check the outputs, random frames are used without it")
+flags.DEFINE_integer("num_frames", 20, "Number of frames used to check the outputs")
+flags.DEFINE_integer("width", 640, "Frame width")
+flags.DEFINE_integer("height", 480, "Frame height")
+flags.DEFINE_float("tolerance", 1e-4, "Maximum absolute difference allowed between both models")
+
+FLAGS = flags.FLAGS
+
+TRANSFORMS = [
+    "strip_unused_nodes(type=uint8)",
+    "remove_nodes(op=CheckNumerics)",
+    "fold_constants(ignore_errors=true)",
+    "fold_batch_norms",
+    "fold_old_batch_norms",
+    "merge_duplicate_nodes",
+    "strip_unused_nodes(type=uint8)",
+    "sort_by_execution_order",
+]
+
+
+def limit_detections(graph_def, top_k):
+    # The original outputs are renamed and sliced into new nodes carrying their names, so loaders keep working
+    renamed = {name: name + "_all" for name in DETECTION_OUTPUTS}
+    for node in graph_def.node:
+        if node.name in renamed:
+            node.name = renamed[node.name]
+        for index, node_input in enumerate(node.input):
+            name = node_input.lstrip("^").split(":")[0]
+            if name in renamed:
+                node.input[index] = node_input.replace(name, renamed[name], 1)
+    graph = tf.Graph()
+    with graph.as_default():
+        tf.import_graph_def(graph_def, name='')
+        for name in DETECTION_OUTPUTS:
+            tensor = graph.get_tensor_by_name(renamed[name] + ":0")
+            tf.identity(tensor[:, :top_k], name=name)
+    return graph.as_graph_def()
+
+
+def check(frames, top_k):
+    results = []
+    for path in (FLAGS.pre_trained_model_path, FLAGS.output):
+        start = time.time()
+        detector = HandDetector(path)
+        load_time = time.time() - start
+        detector.detect(frames[0])
+        start = time.time()
+        outputs = [detector.detect(frame) for frame in frames]
+        latency = (time.time() - start) / len(frames)
+        detector.close()
+        print("{}: loaded in {:.2f}s, {:.1f} ms per frame".format(path, load_time, latency * 1000))
+        results.append(outputs)
+    max_diff = 0
+    for original, optimized in zip(*results):
+        for original_output, optimized_output in zip(original, optimized):
+            max_diff = max(max_diff, np.abs(original_output[:top_k] - optimized_output[:top_k]).max())
+    print("Maximum absolute difference over the top {} detections: {:.2e}".format(top_k, max_diff))
+    return max_diff <= FLAGS.tolerance
+
+
+def main(_):
+    graph_def = read_graph_def(FLAGS.pre_trained_model_path)
+    graph_def = limit_detections(graph_def, FLAGS.top_k)
+    graph_def = TransformGraph(graph_def, ["image_tensor"], DETECTION_OUTPUTS, TRANSFORMS)
+    write_graph_def(graph_def, FLAGS.output)
+    print("Wrote {} with {} nodes".format(FLAGS.output, len(graph_def.node)))
+
+    if FLAGS.replay:
+        frames = list(iterate_recording(FLAGS.replay, FLAGS.width, FLAGS.height, FLAGS.num_frames))
+    else:
+        frames = list(np.random.randint(0, 256, (FLAGS.num_frames, FLAGS.height, FLAGS.width, 3), dtype=np.uint8))
+    if check(frames, FLAGS.top_k):
+        print("Outputs match the original model")
+    else:
+        raise SystemExit("Outputs differ from the original model by more than {}".format(FLAGS.tolerance))
+
+
+if __name__ == '__main__':
+    app.run(main)
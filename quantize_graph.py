@@ -0,0 +1,107 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import os
+import shutil
+import tempfile
+from absl import app, flags
+import numpy as np
+from tensorflow.tools.graph_transforms import TransformGraph
+from src.capture import iterate_recording
+from src.benchmark import replay_detections
+from src.detector import HandDetector
+from src.utils import DETECTION_OUTPUTS, read_graph_def, write_graph_def
+from src.config import HAND_GESTURES
+
+flags.DEFINE_string("pre_trained_model_path", "src/pretrained_model.pb", "Path to pre-trained model")
+flags.DEFINE_string("output", "src/quantized_model.pb", "Path to write the quantized model to")
+flags.DEFINE_string("calibration", None, "Recording whose frames calibrate the quantization ranges")
+flags.DEFINE_integer("calibration_frames", 100, "Number of frames used for calibration")
+flags.DEFINE_string("replay", None, "Recording the quantized model is checked on, defaults to the calibration one")
+flags.DEFINE_integer("max_frames", 0, "Number of frames used for the check, 0 for the whole recording")
+flags.DEFINE_integer("width", 640, "Frame width")
+flags.DEFINE_integer("height", 480, "Frame height")
+flags.DEFINE_float("threshold", 0.6, "Threshold for score")
+
+FLAGS = flags.FLAGS
+
+# Eight bit weights and eight bit kernels for the operations that have one, with float kept everywhere else
+QUANTIZE_TRANSFORMS = [
+    "add_default_attributes",
+    "strip_unused_nodes(type=uint8)",
+    "remove_nodes(op=CheckNumerics)",
+    "fold_constants(ignore_errors=true)",
+    "fold_batch_norms",
+    "fold_old_batch_norms",
+    "quantize_weights",
+    "quantize_nodes",
+    "strip_unused_nodes(type=uint8)",
+    "sort_by_execution_order",
+]
+LOGGING_TRANSFORM = 'insert_logging(op=RequantizationRange, show_name=true, message="__requant_min_max:")'
+FREEZE_TRANSFORM = 'freeze_requantization_ranges(min_max_log_file="{}")'
+
+
+def calibrate(graph_def, frames, directory):
+    """ Replace the ranges quantize_nodes computes on every run by the ones observed over the calibration frames
+    Without calibration, every quantized layer measures the range of its output before requantizing it, which
+    costs about as much as the quantized layer saves.
+    """
+    logged_path = os.path.join(directory, "logged.pb")
+    log_path = os.path.join(directory, "min_max_log.txt")
+    write_graph_def(TransformGraph(graph_def, ["image_tensor"], DETECTION_OUTPUTS, [LOGGING_TRANSFORM]), logged_path)
+    detector = HandDetector(logged_path)
+    # The logging ops print on the standard error of the process, which goes to the log file while they run
+    stderr = os.dup(2)
+    with open(log_path, "w") as log:
+        os.dup2(log.fileno(), 2)
+        try:
+            for frame in frames:
+                detector.detect(frame)
+        finally:
+            os.dup2(stderr, 2)
+            os.close(stderr)
+    detector.close()
+    return TransformGraph(graph_def, ["image_tensor"], DETECTION_OUTPUTS, [FREEZE_TRANSFORM.format(log_path)])
+
+
+def evaluate(path):
+    detector = HandDetector(path)
+    latencies, hands = replay_detections(detector, FLAGS.replay, FLAGS.width, FLAGS.height, FLAGS.threshold,
+                                         FLAGS.max_frames, num_hands=1)
+    detector.close()
+    return latencies, [HAND_GESTURES[frame_hands[0]["class_id"] - 1] if len(frame_hands) else None
+                       for frame_hands in hands]
+
+
+def main(_):
+    if FLAGS.calibration is None:
+        raise ValueError("--calibration is required")
+    FLAGS.replay = FLAGS.replay or FLAGS.calibration
+    graph_def = read_graph_def(FLAGS.pre_trained_model_path)
+    graph_def = TransformGraph(graph_def, ["image_tensor"], DETECTION_OUTPUTS, QUANTIZE_TRANSFORMS)
+    frames = list(iterate_recording(FLAGS.calibration, FLAGS.width, FLAGS.height, FLAGS.calibration_frames))
+    directory = tempfile.mkdtemp()
+    try:
+        graph_def = calibrate(graph_def, frames, directory)
+    finally:
+        shutil.rmtree(directory)
+    write_graph_def(graph_def, FLAGS.output)
+    print("Wrote {} calibrated on {} frames".format(FLAGS.output, len(frames)))
+
+    float_latencies, float_gestures = evaluate(FLAGS.pre_trained_model_path)
+    quantized_latencies, quantized_gestures = evaluate(FLAGS.output)
+    print("{:>10} {:>10} {:>10}".format("model", "mean ms", "p95 ms"))
+    for name, latencies in (("float", float_latencies), ("int8", quantized_latencies)):
+        print("{:>10} {:>10.1f} {:>10.1f}".format(name, latencies.mean(), np.percentile(latencies, 95)))
+    pairs = list(zip(float_gestures, quantized_gestures))
+    found = [(original, quantized) for original, quantized in pairs if original is not None and quantized is not None]
+    print("Hand found by both models or by neither: {:.1%} of {} frames".format(
+        np.mean([(original is None) == (quantized is None) for original, quantized in pairs]), len(pairs)))
+    if found:
+        print("Same Open/Closed gesture when both found a hand: {:.1%} of {} frames".format(
+            np.mean([original == quantized for original, quantized in found]), len(found)))
+
+
+if __name__ == '__main__':
+    app.run(main)
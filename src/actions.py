@@ -0,0 +1,45 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+from src.zones import Zone, ZoneLayout
+from src.config import ORANGE, YELLOW, CYAN, BLUE
+
+# Actions are indices into COMPLEX_MOVEMENT for Mario, into the ChromeDino-v0 actions for the dinosaur and into the
+# moves handled by battle_city() for Battle City
+MARIO_LAYOUT = ZoneLayout([
+    Zone("rect", (0, 0, 1 / 3, 1), ORANGE, {"Open": (7, "Jump left"), "Closed": (6, "Run left")}),
+    Zone("rect", (1 / 3, 0, 2 / 3, 1), None, {"Open": (5, "Jump"), "Closed": (0, "Stay")}),
+    Zone("rect", (2 / 3, 0, 1, 1), ORANGE, {"Open": (2, "Jump right"), "Closed": (1, "Run right")}),
+], default={"Open": (0, "Stay"), "Closed": (0, "Stay")})
+
+DINOSAUR_LAYOUT = ZoneLayout([
+    # A hand exactly on the middle line neither jumps nor ducks
+    Zone("rect", (0, 1 / 2, 1, 1 / 2), None, {}),
+    Zone("rect", (0, 0, 1, 1 / 2), YELLOW, {"Open": (1, "Jump")}),
+    Zone("rect", (0, 1 / 2, 1, 1), None, {"Open": (2, "Duck")}),
+], default={"Open": (0, "Run"), "Closed": (0, "Run")})
+
+BATTLE_CITY_LAYOUT = ZoneLayout([
+    Zone("circle", (1 / 2, 1 / 2, 1 / 6), BLUE, {"Closed": (0, "Stay")}),
+    Zone("triangle", ((0, 0), (1, 0), (1 / 2, 1 / 2)), CYAN, {"Closed": (1, "Up")}),
+    Zone("triangle", ((0, 1), (1, 1), (1 / 2, 1 / 2)), CYAN, {"Closed": (2, "Down")}),
+    Zone("triangle", ((0, 0), (0, 1), (1 / 2, 1 / 2)), YELLOW, {"Closed": (3, "Left")}),
+    Zone("triangle", ((1, 0), (1, 1), (1 / 2, 1 / 2)), YELLOW, {"Closed": (4, "Right")}),
+], default={"Open": (5, "Fire"), "Closed": (0, "Stay")})
+
+GAME_LAYOUTS = {"mario": MARIO_LAYOUT, "dinosaur": DINOSAUR_LAYOUT, "battle_city": BATTLE_CITY_LAYOUT}
+
+
+def game_actions(hands, width, height):
+    """ Action of every game for the hands found on a frame
+    @return dict of game name to (action, text), None when the game would not react
+    """
+    actions = {}
+    for game, layout in GAME_LAYOUTS.items():
+        # The games only react when exactly one hand is visible
+        if len(hands) == 1:
+            hand = hands[0]
+            actions[game] = layout.compile(width, height).action(hand["class_id"], hand["x"], hand["y"])
+        else:
+            actions[game] = None
+    return actions
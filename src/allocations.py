@@ -0,0 +1,46 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import tracemalloc
+
+
+class AllocationCounter(object):
+    """ Measures the memory allocated while handling each frame, with tracemalloc
+    numpy and OpenCV buffers are traced too. The peak above the memory in use when the frame started tells how
+    many frame-sized buffers were alive at once on top of the long-lived ones, allocations made by the capture
+    thread in the meantime included. Tracing slows every allocation down, so it is only on when enabled.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.baseline = 0
+        self.frames = 0
+        self.total = 0
+        if enabled:
+            tracemalloc.start()
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+            self.baseline = tracemalloc.get_traced_memory()[0]
+        else:
+            # reset_peak comes with Python 3.9, before it clearing the traces is the only way to reset the peak.
+            # Blocks allocated earlier are forgotten, so the ones freed during the frame do not lower the peak.
+            tracemalloc.clear_traces()
+            self.baseline = 0
+
+    def end_frame(self):
+        if self.enabled:
+            self.total += tracemalloc.get_traced_memory()[1] - self.baseline
+            self.frames += 1
+
+    def report(self, frame_bytes):
+        mean = self.total / max(self.frames, 1)
+        return "{:.2f} MB allocated at peak per frame, {:.1f} frame buffers".format(mean / 1024 ** 2,
+                                                                                mean / frame_bytes)
+
+    def stop(self):
+        if self.enabled:
+            tracemalloc.stop()
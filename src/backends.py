@@ -0,0 +1,129 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import os
+import cv2
+import numpy as np
+from src.utils import load_graph
+
+# Every backend pads its outputs to the number of detections the frozen graph returns
+MAX_DETECTIONS = 100
+
+
+def pad_detections(boxes, scores, classes, size=MAX_DETECTIONS):
+    """ Sort detections by score and pad them with zeros to a fixed size
+    @return boxes of shape (size, 4) as [y_min, x_min, y_max, x_max], scores and classes of shape (size,)
+    """
+    order = np.argsort(-scores)[:size]
+    padded_boxes = np.zeros((size, 4), dtype=np.float32)
+    padded_scores = np.zeros(size, dtype=np.float32)
+    padded_classes = np.zeros(size, dtype=np.float32)
+    padded_boxes[:len(order)] = boxes[order]
+    padded_scores[:len(order)] = scores[order]
+    padded_classes[:len(order)] = classes[order]
+    return padded_boxes, padded_scores, padded_classes
+
+
+class TensorflowBackend(object):
+    """ The frozen graph run by a TensorFlow session, or a memory-mapped model directory """
+
+    def __init__(self, path, intra_op_threads=0, inter_op_threads=0):
+        self.graph, self.sess = load_graph(path, intra_op_threads, inter_op_threads)
+        input_image = self.graph.get_tensor_by_name('image_tensor:0')
+        fetches = [self.graph.get_tensor_by_name('detection_boxes:0'),
+                   self.graph.get_tensor_by_name('detection_scores:0'),
+                   self.graph.get_tensor_by_name('detection_classes:0')]
+        self.run = self.sess.make_callable(fetches, feed_list=[input_image])
+
+    def close(self):
+        self.sess.close()
+
+
+class OpenCVBackend(object):
+    """ The frozen graph run by the OpenCV DNN module
+    OpenCV needs a text description of the graph next to it, with the same name and a .pbtxt extension, as written
+    by tf_text_graph_ssd.py from the OpenCV samples. Frames are resized to the input size of the model here, the
+    graph itself does not do it. OpenCV parallelizes with its own thread pool, sized by --cv_threads.
+    """
+
+    def __init__(self, path, intra_op_threads=0, inter_op_threads=0, input_size=(300, 300)):
+        self.net = cv2.dnn.readNetFromTensorflow(path, os.path.splitext(path)[0] + ".pbtxt")
+        self.input_size = input_size
+
+    def run(self, images):
+        self.net.setInput(cv2.dnn.blobFromImages(list(images), size=self.input_size, swapRB=False, crop=False))
+        # One row per detection of the whole batch: [image, class, score, x_min, y_min, x_max, y_max]
+        detections = self.net.forward().reshape(-1, 7)
+        outputs = []
+        for index in range(len(images)):
+            rows = detections[detections[:, 0] == index]
+            outputs.append(pad_detections(np.clip(rows[:, [4, 3, 6, 5]], 0, 1), rows[:, 2], rows[:, 1]))
+        return [np.stack(output) for output in zip(*outputs)]
+
+    def close(self):
+        self.net = None
+
+
+class OnnxBackend(object):
+    """ The detector converted to ONNX, run by ONNX Runtime
+    The model is expected to come from tf2onnx with the input and output names of the frozen graph:
+        python -m tf2onnx.convert --graphdef src/pretrained_model.pb --output src/pretrained_model.onnx
+            --inputs image_tensor:0 --outputs detection_boxes:0,detection_scores:0,detection_classes:0
+    """
+
+    def __init__(self, path, intra_op_threads=0, inter_op_threads=0):
+        import onnxruntime
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_names = ["detection_boxes:0", "detection_scores:0", "detection_classes:0"]
+
+    def run(self, images):
+        return self.session.run(self.output_names, {self.input_name: images})
+
+    def close(self):
+        self.session = None
+
+
+class TFLiteBackend(object):
+    """ The detector exported for TensorFlow Lite with its detection post-processing op
+    tflite_runtime is used when installed, TensorFlow otherwise. The interpreter takes one frame at a time at the
+    input size of the model. Float models expect pixels scaled to [-1, 1], and classes come out 0-based.
+    """
+
+    def __init__(self, path, intra_op_threads=0, inter_op_threads=0):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=path, num_threads=intra_op_threads or None)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        _, height, width, _ = self.input["shape"]
+        self.input_size = (int(width), int(height))
+        # Outputs of TFLite_Detection_PostProcess: boxes, classes, scores and number of detections
+        self.outputs = [detail["index"] for detail in self.interpreter.get_output_details()[:4]]
+        self.buffer = np.empty((1, height, width, 3), dtype=np.uint8)
+
+    def run(self, images):
+        outputs = []
+        for image in images:
+            cv2.resize(image, self.input_size, dst=self.buffer[0], interpolation=cv2.INTER_AREA)
+            if self.input["dtype"] == np.uint8:
+                self.interpreter.set_tensor(self.input["index"], self.buffer)
+            else:
+                self.interpreter.set_tensor(self.input["index"], (self.buffer / 127.5 - 1).astype(np.float32))
+            self.interpreter.invoke()
+            boxes, classes, scores, count = (self.interpreter.get_tensor(index)[0] for index in self.outputs)
+            count = int(count)
+            outputs.append(pad_detections(np.clip(boxes[:count], 0, 1), scores[:count], classes[:count] + 1))
+        return [np.stack(output) for output in zip(*outputs)]
+
+    def close(self):
+        self.interpreter = None
+
+
+BACKENDS = {"tensorflow": TensorflowBackend, "opencv": OpenCVBackend, "onnx": OnnxBackend, "tflite": TFLiteBackend}
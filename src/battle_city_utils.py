@@ -1,12 +1,12 @@
 import os, pygame, time, random, uuid, sys
 import numpy as np
 from src.config import *
+from src.scheduler import StepStats
 
-sprites = pygame.transform.scale(pygame.image.load("resources/images/sprites.gif"), [192, 224])
-if IS_FULLSCREEN:
-    screen = pygame.display.set_mode(((WIDTH, HEIGHT)), pygame.FULLSCREEN)
-else:
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+# Assets, window and castle are only set up by create_game, so importing this module stays cheap and headless
+sprites = None
+screen = None
+castle = None
 
 players = []
 enemies = []
@@ -112,9 +112,6 @@ class Castle():
         self.active = False
 
 
-castle = Castle()
-
-
 class Bonus():
     """ Various power-ups
     When bonus is spawned, it begins flashing and after some time dissapears
@@ -1949,10 +1946,30 @@ class Game():
         self.draw()
 
 
-def battle_city(v, lock):
+def create_game(display=True):
+    """ Load the sprites, open the window and build the castle on first use, then start a new Game
+    Without display, SDL renders to its dummy video and audio drivers, so the game runs the same but nothing is
+    shown or played. The choice is made by the first call, pygame cannot switch drivers once the window is open.
+    """
+    global sprites, screen, castle
+    if screen is None:
+        if not display:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        sprites = pygame.transform.scale(pygame.image.load("resources/images/sprites.gif"), [192, 224])
+        if IS_FULLSCREEN and display:
+            screen = pygame.display.set_mode(((WIDTH, HEIGHT)), pygame.FULLSCREEN)
+        else:
+            screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        castle = Castle()
+    return Game()
+
+
+def battle_city(channel, display=True, max_age=0):
     global play_sounds
+    stats = StepStats("Battle City", channel.latency)
     while True:
-        game = Game()
+        game = create_game(display)
         game.showMenu()
         game.nextLevel()
         while game.running:
@@ -2012,21 +2029,23 @@ def battle_city(v, lock):
                                 elif index == 4:
                                     player.pressed[3] = False
 
+            # Read once per frame without any lock, the detection process never waits for the game
+            action, played = channel.current(max_age=max_age)
+            stats.step(played)
             for player in players:
                 if player.state == player.STATE_ALIVE and not game.game_over and game.active:
-                    with lock:
-                        if v.value == 1:
-                            player.move(game.DIR_UP)
-                        elif v.value == 4:
-                            player.move(game.DIR_RIGHT)
-                        elif v.value == 2:
-                            player.move(game.DIR_DOWN)
-                        elif v.value == 3:
-                            player.move(game.DIR_LEFT)
-                        elif v.value == 5:
-                            player.fire()
-                            if play_sounds and player.active_bullets == 0:
-                                sounds["fire"].play()
+                    if action == 1:
+                        player.move(game.DIR_UP)
+                    elif action == 4:
+                        player.move(game.DIR_RIGHT)
+                    elif action == 2:
+                        player.move(game.DIR_DOWN)
+                    elif action == 3:
+                        player.move(game.DIR_LEFT)
+                    elif action == 5:
+                        player.fire()
+                        if play_sounds and player.active_bullets == 0:
+                            sounds["fire"].play()
                 player.update(time_passed)
 
             for enemy in enemies:
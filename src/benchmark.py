@@ -0,0 +1,32 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import time
+import numpy as np
+from src.capture import iterate_recording
+from src.utils import predict_array
+
+
+def replay_detections(detector, path, width, height, threshold, max_frames=0, num_hands=2):
+    """ Time the detector on every frame of a recording
+    @return detection latencies in ms and the hands found on each frame, as structured arrays of predict_array
+    """
+    latencies = []
+    hands = []
+    for index, frame in enumerate(iterate_recording(path, width, height, max_frames)):
+        if index == 0:
+            # The first run is much slower than steady state, keep it out of the measurement
+            detector.detect(frame)
+        start = time.time()
+        boxes, scores, classes = detector.detect(frame)
+        latencies.append(time.time() - start)
+        hands.append(predict_array(boxes, scores, classes, threshold, width, height, num_hands))
+    return np.array(latencies) * 1000, hands
+
+
+def action_agreements(actions, reference_actions, games):
+    """ Share of frames where each game gets the same action as in the reference, game_actions results both
+    A frame without action in both counts as a match.
+    """
+    return [np.mean([(action[game] or (None,))[0] == (reference[game] or (None,))[0]
+                     for action, reference in zip(actions, reference_actions)]) for game in games]
@@ -0,0 +1,216 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import os
+import struct
+import threading
+import time
+import cv2
+import numpy as np
+
+
+def open_capture(src, width, height, realtime=True):
+    """ Open a camera index, a video file or a recording made by FrameRecorder """
+    if isinstance(src, str) and os.path.isdir(src):
+        return ReplayCapture(src, realtime)
+    cap = cv2.VideoCapture(src)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    return cap
+
+
+def read_recording(path, width, height, max_frames=0):
+    """ Yield the frames of a recording as captured, in BGR and resized to the frame size """
+    cap = ReplayCapture(path, realtime=False)
+    count = 0
+    while not max_frames or count < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame if frame.shape[:2] == (height, width) else cv2.resize(frame, (width, height))
+        count += 1
+    cap.release()
+
+
+def iterate_recording(path, width, height, max_frames=0):
+    """ Yield the frames of a recording the way the game scripts feed them to the detector, mirrored and in RGB """
+    for frame in read_recording(path, width, height, max_frames):
+        yield cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+
+
+# Room left for the .npy header, enough for any frame shape, so that it can be rewritten in place on close
+NPY_HEADER_SIZE = 128
+
+
+def npy_header(shape):
+    """ Version 1.0 .npy header of a uint8 array, padded to NPY_HEADER_SIZE bytes """
+    header = "{{'descr': '|u1', 'fortran_order': False, 'shape': {}, }}".format(shape)
+    header = header.ljust(NPY_HEADER_SIZE - 11) + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+class FrameRecorder(object):
+    """ Dumps frames and their capture timestamps into .npy files
+    Frames are written straight into a memory-mapped file that grows by chunk frames at a time, up to max_frames.
+    On close the file is cut down to the frames actually recorded and its header rewritten with their number.
+    """
+
+    def __init__(self, path, max_frames=9000, chunk=256):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_frames = max_frames
+        self.chunk = chunk
+        self.file = None
+        self.frames = None
+        self.timestamps = np.zeros(max_frames)
+        self.count = 0
+
+    def grow(self, shape):
+        capacity = min(self.count + self.chunk, self.max_frames)
+        if self.frames is not None:
+            self.frames.flush()
+        self.file.truncate(NPY_HEADER_SIZE + capacity * int(np.prod(shape)))
+        self.frames = np.memmap(self.file, dtype=np.uint8, mode="r+", offset=NPY_HEADER_SIZE,
+                                shape=(capacity,) + shape)
+
+    def write(self, frame, timestamp):
+        if self.file is None:
+            self.file = open(os.path.join(self.path, "frames.npy"), "w+b")
+            self.file.write(npy_header((0,) + frame.shape))
+        if self.count == self.max_frames:
+            return False
+        if self.frames is None or self.count == len(self.frames):
+            self.grow(frame.shape)
+        self.frames[self.count] = frame
+        self.timestamps[self.count] = timestamp
+        self.count += 1
+        if self.count == self.max_frames:
+            print("Recorded {} frames, the limit, later frames are not recorded".format(self.max_frames))
+        return True
+
+    def close(self):
+        if self.file is not None:
+            shape = (self.count,) + self.frames.shape[1:]
+            self.frames.flush()
+            self.frames = None
+            self.file.seek(0)
+            self.file.write(npy_header(shape))
+            self.file.truncate(NPY_HEADER_SIZE + int(np.prod(shape)))
+            self.file.close()
+            self.file = None
+        np.save(os.path.join(self.path, "timestamps.npy"), self.timestamps[:self.count])
+
+
+class ReplayCapture(object):
+    """ Serves a FrameRecorder recording through the cv2.VideoCapture interface
+    Frames are read-only views into the memory-mapped file. With realtime the recorded pace is kept, otherwise
+    frames are served as fast as they are read.
+    """
+
+    def __init__(self, path, realtime=True):
+        self.timestamps = np.load(os.path.join(path, "timestamps.npy"))
+        self.frames = np.load(os.path.join(path, "frames.npy"), mmap_mode="r")[:len(self.timestamps)]
+        self.realtime = realtime
+        self.position = 0
+        self.start = None
+
+    def isOpened(self):
+        return self.frames is not None
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return self.frames.shape[2]
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return self.frames.shape[1]
+        elif prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.timestamps)
+        elif prop == cv2.CAP_PROP_POS_FRAMES:
+            return self.position
+        return 0
+
+    def read(self):
+        if self.frames is None or self.position >= len(self.timestamps):
+            return False, None
+        if self.realtime:
+            if self.start is None:
+                self.start = time.time()
+            delay = self.start + self.timestamps[self.position] - self.timestamps[0] - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        frame = self.frames[self.position]
+        self.position += 1
+        return True, frame
+
+    def release(self):
+        self.frames = None
+
+
+class VideoStream(object):
+    """ Reads frames from a capture device on a background thread
+    Only the newest frame is kept, so a slow consumer always gets the latest image instead of a queued one.
+    Frames that were captured but never read are counted in dropped. Every captured frame goes to the recorder
+    when one is given. A recording replayed without realtime is served in lockstep so that no frame is dropped and
+    benchmarks see the same frames on every run.
+    """
+
+    def __init__(self, src=0, width=640, height=480, realtime=True, recorder=None):
+        self.cap = open_capture(src, width, height, realtime)
+        self.recorder = recorder
+        self.lockstep = isinstance(self.cap, ReplayCapture) and not realtime
+        self.condition = threading.Condition()
+        self.frame = None
+        self.index = -1
+        self.timestamp = 0.0
+        self.last_index = -1
+        self.dropped = 0
+        self.stopped = False
+        self.thread = threading.Thread(target=self.update, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def update(self):
+        while not self.stopped:
+            ret, frame = self.cap.read()
+            timestamp = time.time()
+            if ret and self.recorder is not None:
+                self.recorder.write(frame, timestamp)
+            with self.condition:
+                while self.lockstep and self.index != self.last_index and not self.stopped:
+                    self.condition.wait()
+                if not ret:
+                    self.stopped = True
+                else:
+                    self.frame = frame
+                    self.index += 1
+                    self.timestamp = timestamp
+                self.condition.notify_all()
+
+    def read(self):
+        """ Wait for a frame newer than the previous one
+        @return (frame index, capture timestamp, frame), frame is None once the source is exhausted
+        """
+        with self.condition:
+            while self.index == self.last_index and not self.stopped:
+                self.condition.wait()
+            if self.index == self.last_index:
+                return self.index, self.timestamp, None
+            if self.last_index >= 0:
+                # Frames captured before the first read, while the consumer was still starting up, are not drops
+                self.dropped += self.index - self.last_index - 1
+            self.last_index = self.index
+            self.condition.notify_all()
+            return self.index, self.timestamp, self.frame
+
+    def release(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.cap.release()
+        if self.recorder is not None:
+            self.recorder.close()
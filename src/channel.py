@@ -0,0 +1,76 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import ctypes
+import time
+from src.latency import LatencyHistogram
+
+
+class ActionRecord(ctypes.Structure):
+    _fields_ = [("sequence", ctypes.c_uint64), ("action", ctypes.c_int32), ("timestamp", ctypes.c_double),
+                ("confidence", ctypes.c_double), ("published", ctypes.c_double)]
+
+
+class ActionChannel(object):
+    """ Latest action sent from the detection process to the game process, in shared memory and without locks
+    The detection process is the only writer. It makes the sequence number odd while it updates the record and even
+    again once done, and a reader retries until it sees the same even number before and after copying the record
+    (a seqlock), so neither side ever waits for the other. Every action carries the capture timestamp of the frame
+    it comes from and the score of the hand, so the game can tell how stale it is.
+    A game that has nothing to do until a new action comes can sleep in wait(). The event behind it is the only
+    lock involved and it is never held for longer than setting a flag, the record itself stays lock-free.
+    The game records in latency how long after capture each new action gets played.
+    """
+
+    def __init__(self, mp):
+        self.record = mp.RawValue(ActionRecord)
+        self.event = mp.Event()
+        self.latency = LatencyHistogram(mp)
+        # Reader side state, every process holds its own copy
+        self.reset_sequence = 0
+
+    def publish(self, action, timestamp, confidence):
+        record = self.record
+        record.sequence += 1
+        record.action = action
+        record.timestamp = timestamp
+        record.confidence = confidence
+        record.published = time.time()
+        record.sequence += 1
+        self.event.set()
+
+    def read(self):
+        """ @return (number of actions published so far, action, capture timestamp, confidence, publish time) """
+        record = self.record
+        while True:
+            sequence = record.sequence
+            if sequence % 2:
+                continue
+            action, timestamp, confidence, published = (record.action, record.timestamp, record.confidence,
+                                                        record.published)
+            if record.sequence == sequence:
+                return sequence // 2, action, timestamp, confidence, published
+
+    def wait(self, timeout=None):
+        """ Sleep until an action is published, at most timeout seconds
+        @return True when an action was published since the previous wait
+        """
+        if self.event.wait(timeout):
+            self.event.clear()
+            return True
+        return False
+
+    def reset(self):
+        """ Ignore the actions published so far, like when the game starts over """
+        self.reset_sequence = self.read()[0]
+
+    def current(self, default=0, max_age=0):
+        """ Action to play now, default when none was published since the last reset or, with max_age in seconds,
+        when the latest one comes from a frame older than that
+        @return (action, played) with played the (count, capture timestamp, publish time) of the action, None when
+        default is returned
+        """
+        count, action, timestamp, _, published = self.read()
+        if count <= self.reset_sequence or (max_age and time.time() - timestamp > max_age):
+            return default, None
+        return action, (count, timestamp, published)
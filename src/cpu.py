@@ -0,0 +1,30 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import os
+import cv2
+
+
+def parse_cpus(spec):
+    """ Turn a CPU list like "0-2,5" into a set of CPU numbers, empty when the string is, meaning no restriction """
+    cpus = set()
+    for part in filter(None, (part.strip() for part in spec.split(","))):
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def set_affinity(cpus, pid=0):
+    """ Pin a process, the current one by default, to the given CPUs
+    @return False when there is nothing to pin or the platform does not support it (only Linux does)
+    """
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return False
+    os.sched_setaffinity(pid, cpus)
+    return True
+
+
+def set_cv_threads(num_threads):
+    # OpenCV keeps its own pool per process, a negative number leaves its default of one thread per core
+    if num_threads >= 0:
+        cv2.setNumThreads(num_threads)
@@ -0,0 +1,56 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import cv2
+import numpy as np
+from src.backends import BACKENDS
+
+INTERPOLATIONS = {"nearest": cv2.INTER_NEAREST, "linear": cv2.INTER_LINEAR, "area": cv2.INTER_AREA,
+                  "cubic": cv2.INTER_CUBIC}
+
+
+class HandDetector(object):
+    """ Hand detector running the model through one of BACKENDS
+    With the default tensorflow backend, tensors are resolved once and the session call is compiled with
+    make_callable, so a detection only pays for the graph execution itself. Every backend returns boxes, scores
+    and classes laid out like the frozen graph outputs.
+    With input_size as (width, height), frames are downscaled into a preallocated buffer before inference. Boxes
+    come out normalized to [0, 1] either way, so predict maps them back onto the full frame unchanged.
+    intra_op_threads and inter_op_threads size the inference thread pools, see load_graph.
+    """
+
+    def __init__(self, path, input_size=None, interpolation="area", intra_op_threads=0, inter_op_threads=0,
+                 backend="tensorflow"):
+        self.backend = BACKENDS[backend](path, intra_op_threads, inter_op_threads)
+        self.run = self.backend.run
+        self.input_size = tuple(input_size) if input_size else None
+        self.interpolation = INTERPOLATIONS[interpolation]
+        self.buffer = None
+
+    def resize(self, image):
+        if self.input_size is None or image.shape[1::-1] == self.input_size:
+            return image
+        if self.buffer is None:
+            self.buffer = np.empty((1, self.input_size[1], self.input_size[0], 3), dtype=np.uint8)
+        cv2.resize(image, self.input_size, dst=self.buffer[0], interpolation=self.interpolation)
+        return self.buffer[0]
+
+    def detect(self, image):
+        boxes, scores, classes = self.run(self.resize(image)[None, :, :, :])
+        return boxes[0], scores[0], classes[0]
+
+    def warmup(self, width, height):
+        """ Run the detector once on a blank frame of the given size """
+        self.detect(np.zeros((height, width, 3), dtype=np.uint8))
+
+    def detect_batch(self, images):
+        """ Detect hands on a batch of equally sized images
+        @return boxes, scores and classes with a leading batch dimension
+        """
+        if self.input_size is not None:
+            images = np.stack([cv2.resize(image, self.input_size, interpolation=self.interpolation)
+                               for image in images])
+        return self.run(images)
+
+    def close(self):
+        self.backend.close()
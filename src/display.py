@@ -0,0 +1,65 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import signal
+import threading
+import cv2
+import numpy as np
+
+
+class PreviewWindow(object):
+    """ Shows the latest annotated frame from its own thread, at its own rate
+    show() only copies the frame into a buffer and returns, so the detection loop never waits for the GUI. The
+    display thread owns the window and polls the keyboard, q sets quit. Frames shown faster than the preview rate
+    replace each other. Headless, nothing is shown and Ctrl+C sets quit instead, so the loop still ends cleanly.
+    HighGUI has to run on the main thread on macOS, where this only works headless.
+    """
+
+    def __init__(self, name="Detection", fps=30, headless=False):
+        self.name = name
+        self.delay = max(1, int(1000 / fps))
+        self.headless = headless
+        self.quit = False
+        self.pending = None
+        self.fresh = False
+        self.shown = 0
+        self.lock = threading.Lock()
+        self.thread = None
+        if headless:
+            signal.signal(signal.SIGINT, self.interrupt)
+        else:
+            self.thread = threading.Thread(target=self.update, name="display", daemon=True)
+            self.thread.start()
+
+    def interrupt(self, signum, frame):
+        self.quit = True
+
+    def show(self, frame):
+        if self.headless:
+            return
+        with self.lock:
+            if self.pending is None or self.pending.shape != frame.shape:
+                self.pending = np.empty_like(frame)
+            np.copyto(self.pending, frame)
+            self.fresh = True
+
+    def update(self):
+        image = None
+        while not self.quit:
+            with self.lock:
+                fresh = self.fresh
+                if fresh:
+                    # Swap buffers, the next show() writes into the one that was on screen
+                    image, self.pending = self.pending, image
+                    self.fresh = False
+            if fresh:
+                cv2.imshow(self.name, image)
+                self.shown += 1
+            if cv2.waitKey(self.delay) == ord("q"):
+                self.quit = True
+        cv2.destroyWindow(self.name)
+
+    def close(self):
+        self.quit = True
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,85 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import sys
+import time
+from time import sleep
+from src.scheduler import FrameScheduler, StepStats, NES_FRAME_RATE, CHROME_DINO_FRAME_RATE
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Each game imports its own backend when it starts, so a script only pays for the emulator it actually runs
+
+
+def report_startup(name, spawned_at):
+    """ Print how long the game process took to get ready, its peak memory and whether TensorFlow got imported
+    The game process never runs the detector, so TensorFlow showing up here means a module imported it at the top
+    level and the process pays for it in start time and memory for nothing.
+    """
+    if spawned_at is None:
+        return
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        max_rss = max_rss / 1024 ** 2 if sys.platform == "darwin" else max_rss / 1024
+        memory = "{:.0f} MB".format(max_rss)
+    else:
+        memory = "unknown"
+    print("{} process ready in {:.2f}s, peak memory {}, TensorFlow imported: {}".format(
+        name, time.time() - spawned_at, memory, "tensorflow" in sys.modules))
+
+
+def mario(channel, spawned_at=None, max_age=0, pacing="frame"):
+    from nes_py.wrappers import JoypadSpace
+    import gym_super_mario_bros
+    from gym_super_mario_bros.actions import COMPLEX_MOVEMENT
+    env = gym_super_mario_bros.make('SuperMarioBros-1-1-v0')
+    env = JoypadSpace(env, COMPLEX_MOVEMENT)
+    report_startup("Mario", spawned_at)
+    # The emulator only moves on when stepped, it is stepped at the rate of the console and plays the latest action
+    scheduler = FrameScheduler(NES_FRAME_RATE)
+    stats = StepStats("Mario", channel.latency)
+    done = True
+    while True:
+        if done:
+            env.reset()
+            channel.reset()
+        if pacing == "frame":
+            scheduler.wait()
+        u, played = channel.current(max_age=max_age)
+        stats.step(played)
+        _, _, done, _ = env.step(u)
+        env.render()
+        if pacing == "poll":
+            sleep(0.01)
+
+
+def dinosaur(channel, spawned_at=None, max_age=0, pacing="frame"):
+    import gym
+    from gym_chrome_dino.utils.wrappers import make_dino
+    env = gym.make('ChromeDino-v0')
+    env = make_dino(env, timer=True, frame_stack=True)
+    report_startup("Dinosaur", spawned_at)
+    # The browser game runs on its own, a step only sends the key, so a new action is sent as soon as it comes
+    scheduler = FrameScheduler(CHROME_DINO_FRAME_RATE, wake=channel.wait)
+    stats = StepStats("Dinosaur", channel.latency)
+    done = True
+    while True:
+        if done:
+            env.reset()
+            channel.reset()
+        if pacing == "frame":
+            scheduler.wait()
+        u, played = channel.current(max_age=max_age)
+        stats.step(played)
+        _, _, done, _ = env.step(u)
+
+
+def battle_city(channel, spawned_at=None, max_age=0, pacing="frame"):
+    # pygame paces Battle City itself, at 50 frames per second, pacing is only there to match the other games
+    from src.battle_city_utils import battle_city
+    report_startup("Battle City", spawned_at)
+    battle_city(channel, max_age=max_age)
@@ -0,0 +1,40 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import ctypes
+import signal
+import numpy as np
+
+
+class LatencyHistogram(object):
+    """ Histogram of latencies in shared memory, with 1 ms bins up to max_ms and a last bin for everything slower
+    One process adds to it, any process holding it can read percentiles at any time without stopping the writer.
+    """
+
+    def __init__(self, mp, max_ms=1000):
+        self.counts = mp.RawArray(ctypes.c_uint64, max_ms + 1)
+
+    def add(self, seconds):
+        self.counts[min(max(int(seconds * 1000), 0), len(self.counts) - 1)] += 1
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """ @return number of latencies recorded and, for each percent, the upper edge of its bin in ms or None """
+        cumulative = np.cumsum(np.frombuffer(self.counts, dtype=np.uint64))
+        total = int(cumulative[-1])
+        if not total:
+            return 0, [None] * len(percents)
+        return total, [int(np.searchsorted(cumulative, percent / 100 * total)) + 1 for percent in percents]
+
+    def report(self):
+        total, (p50, p95, p99) = self.percentiles()
+        if not total:
+            return "End-to-end latency: no action played yet"
+        last = len(self.counts)
+        return "End-to-end latency over {} actions: p50 {}, p95 {}, p99 {}".format(
+            total, *("{} ms".format(value) if value < last else "over {} ms".format(last - 1)
+                     for value in (p50, p95, p99)))
+
+    def report_on_signal(self):
+        """ Print the report whenever the process gets SIGUSR1, where there is such a signal """
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: print(self.report()))
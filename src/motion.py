@@ -0,0 +1,37 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import cv2
+import numpy as np
+
+
+class MotionGate(object):
+    """ Tells whether a frame is close enough to the last analysed one for its results to be reused
+    Frames are compared on a small grayscale thumbnail by their mean absolute difference in gray levels. A frame
+    counts as static when that difference stays under threshold, but never more than max_reuse times in a row.
+    A threshold of 0 disables the gate.
+    """
+
+    def __init__(self, threshold=0, max_reuse=15, size=(64, 48)):
+        self.threshold = threshold
+        self.max_reuse = max_reuse
+        self.size = size
+        self.thumbnail = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self.gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        self.diff = np.empty((size[1], size[0]), dtype=np.uint8)
+        self.reference = None
+        self.reused = 0
+
+    def is_static(self, image):
+        if self.threshold <= 0:
+            return False
+        cv2.resize(image, self.size, dst=self.thumbnail, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self.thumbnail, cv2.COLOR_RGB2GRAY, dst=self.gray)
+        if self.reference is not None and self.reused < self.max_reuse:
+            cv2.absdiff(self.gray, self.reference, dst=self.diff)
+            if cv2.mean(self.diff)[0] < self.threshold:
+                self.reused += 1
+                return True
+        self.reference = self.gray.copy()
+        self.reused = 0
+        return False
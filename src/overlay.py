@@ -0,0 +1,40 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import cv2
+import numpy as np
+
+
+class ZoneOverlay(object):
+    """ Tints the static zones of a game onto frames
+    draw(image, width, height) paints the zones, like ZoneLayout.draw. The zones are drawn once per frame size into
+    a premultiplied color layer, alpha times the zone color, and a per-pixel scale of 1 - alpha inside the zones and
+    1 outside. Each frame then only costs an in-place multiply and add, both on 8 bit integers, instead of a copy,
+    the drawing and a full-frame addWeighted. Zone colors have to be other than black, which is what marks pixels
+    outside the zones.
+    """
+
+    def __init__(self, draw, alpha):
+        self.draw = draw
+        self.alpha = alpha
+        self.shape = None
+        self.tint = None
+        self.scale = None
+
+    def prepare(self, shape):
+        height, width = shape[:2]
+        layer = np.zeros(shape, dtype=np.uint8)
+        self.draw(layer, width, height)
+        inside = layer.any(axis=2, keepdims=True)
+        self.tint = np.round(layer * self.alpha).astype(np.uint8)
+        # Scale in 1/255 units, cv2.multiply divides the product back
+        self.scale = np.where(inside, round(255 * (1 - self.alpha)), 255).astype(np.uint8).repeat(3, axis=2)
+        self.shape = shape
+
+    def apply(self, frame):
+        """ Blend the zones onto the frame in place """
+        if frame.shape != self.shape:
+            self.prepare(frame.shape)
+        cv2.multiply(frame, self.scale, dst=frame, scale=1 / 255)
+        cv2.add(frame, self.tint, dst=frame)
+        return frame
@@ -0,0 +1,197 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import os
+import queue
+import signal
+import time
+import cv2
+import numpy as np
+from multiprocessing import shared_memory
+from src.capture import open_capture, ReplayCapture
+from src.cpu import set_cv_threads
+from src.detector import HandDetector
+from src.tracker import HandTracker
+
+
+class FrameRing(object):
+    """ Preallocated frame slots in shared memory
+    Stages only exchange slot numbers, the pixels themselves are never pickled.
+    """
+
+    def __init__(self, slots, height, width, name=None):
+        self.shape = (slots, height, width, 3)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=int(np.prod(self.shape)))
+        self.frames = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    def __getstate__(self):
+        return self.shape, self.shm.name
+
+    def __setstate__(self, state):
+        shape, name = state
+        self.__init__(shape[0], shape[1], shape[2], name)
+
+    def close(self):
+        del self.frames
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a frame view, the mapping is released with the process instead
+            pass
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def capture_stage(ring, free_slots, captured, stop, src, width, height, realtime, recorder, cv_threads):
+    # Ctrl+C reaches the whole process group, the main process is the one deciding when stages stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    set_cv_threads(cv_threads)
+    cap = open_capture(src, width, height, realtime)
+    # A recording replayed as fast as possible waits for free slots instead of dropping frames
+    lockstep = isinstance(cap, ReplayCapture) and not realtime
+    index = 0
+    while not stop.is_set():
+        ret, frame = cap.read()
+        timestamp = time.time()
+        if not ret:
+            break
+        if recorder is not None:
+            recorder.write(frame, timestamp)
+        try:
+            slot = free_slots.get(block=lockstep)
+        except queue.Empty:
+            # Every slot is still being processed downstream, this frame is dropped
+            index += 1
+            continue
+        if frame.shape[:2] != (height, width):
+            frame = cv2.resize(frame, (width, height))
+        cv2.flip(frame, 1, dst=ring.frames[slot])
+        captured.put((slot, index, timestamp))
+        index += 1
+    captured.put(None)
+    cap.release()
+    if recorder is not None:
+        recorder.close()
+    ring.close()
+
+
+def inference_stage(ring, free_slots, captured, inferred, path, threshold, width, height, lockstep, detector_options,
+                    tracker_options, cv_threads):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    set_cv_threads(cv_threads)
+    detector = HandDetector(path, **detector_options)
+    detector.warmup(width, height)
+    tracker = HandTracker(detector, threshold, width, height, **tracker_options)
+    rgb = np.empty(ring.shape[1:], dtype=np.uint8)
+    finished = False
+    while not finished:
+        item = captured.get()
+        if item is None:
+            break
+        # Only the newest captured frame is worth detecting, older ones go straight back to the free list
+        while not lockstep:
+            try:
+                newer = captured.get_nowait()
+            except queue.Empty:
+                break
+            if newer is None:
+                finished = True
+                break
+            free_slots.put(item[0])
+            item = newer
+        slot, index, timestamp = item
+        cv2.cvtColor(ring.frames[slot], cv2.COLOR_BGR2RGB, dst=rgb)
+        results = tracker.update(rgb)
+        # The queue pickles in a feeder thread after put() returns, and the tracker updates its results in place
+        inferred.put((slot, index, timestamp, results.copy()))
+    inferred.put(None)
+    detector.close()
+    ring.close()
+
+
+class Pipeline(object):
+    """ Capture, inference and rendering as separate stages
+    Capture and inference run in their own processes and hand frames over through a FrameRing, rendering and
+    action dispatch stay with the caller. Throughput is bounded by the slowest stage instead of the sum of all.
+    detector_options and tracker_options are passed on to the HandDetector and HandTracker of the inference stage.
+    Both stages size their OpenCV thread pool with cv_threads and inherit the CPU affinity of the caller.
+    """
+
+    def __init__(self, mp, src, path, threshold, width, height, slots=4, realtime=True, recorder=None,
+                 detector_options=None, tracker_options=None, cv_threads=-1):
+        lockstep = isinstance(src, str) and os.path.isdir(src) and not realtime
+        self.ring = FrameRing(slots, height, width)
+        self.free_slots = mp.Queue()
+        self.captured = mp.Queue()
+        self.inferred = mp.Queue()
+        self.stop_event = mp.Event()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+        self.processes = [
+            mp.Process(target=capture_stage,
+                       args=(self.ring, self.free_slots, self.captured, self.stop_event, src, width, height, realtime,
+                             recorder, cv_threads)),
+            mp.Process(target=inference_stage,
+                       args=(self.ring, self.free_slots, self.captured, self.inferred, path, threshold, width,
+                             height, lockstep, detector_options or {}, tracker_options or {}, cv_threads))]
+        self.depth_sums = {"free": 0, "captured": 0, "inferred": 0}
+        self.samples = 0
+        self.finished = False
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+        return self
+
+    def get(self):
+        """ Wait for the next inferred frame
+        @return (slot, frame index, capture timestamp, BGR frame, results), frame is None once capture has ended
+        The frame is a view into shared memory and stays valid until done(slot) is called.
+        """
+        item = self.inferred.get()
+        if item is None:
+            self.finished = True
+            return None, None, None, None, None
+        for stage, depth in self.depths().items():
+            self.depth_sums[stage] += max(depth, 0)
+        self.samples += 1
+        slot, index, timestamp, results = item
+        return slot, index, timestamp, self.ring.frames[slot], results
+
+    def done(self, slot):
+        self.free_slots.put(slot)
+
+    def depths(self):
+        depths = {}
+        for stage, stage_queue in (("free", self.free_slots), ("captured", self.captured),
+                                   ("inferred", self.inferred)):
+            try:
+                depths[stage] = stage_queue.qsize()
+            except NotImplementedError:
+                # qsize is not available on macOS
+                depths[stage] = -1
+        return depths
+
+    def report(self):
+        return ", ".join("{} {:.2f}".format(stage, total / max(self.samples, 1))
+                         for stage, total in self.depth_sums.items())
+
+    def stop(self):
+        self.stop_event.set()
+        # Keep consuming until the end marker so the stages can flush their queues and exit
+        while not self.finished:
+            try:
+                item = self.inferred.get(timeout=5)
+            except queue.Empty:
+                break
+            if item is None:
+                self.finished = True
+            else:
+                self.done(item[0])
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.ring.close()
+        self.ring.unlink()
@@ -0,0 +1,25 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import cv2
+import numpy as np
+
+
+class FramePreprocessor(object):
+    """ Mirrors camera frames for display and converts them for the model, into buffers allocated once
+    The mirrored BGR frame is the one drawn on and shown, the RGB one only feeds the model, so nothing has to be
+    converted back. Both buffers are overwritten by the next frame.
+    """
+
+    def __init__(self):
+        self.display = None
+        self.rgb = None
+
+    def process(self, frame):
+        """ @return (mirrored BGR frame, mirrored RGB frame) """
+        if self.display is None or self.display.shape != frame.shape:
+            self.display = np.empty_like(frame)
+            self.rgb = np.empty_like(frame)
+        cv2.flip(frame, 1, dst=self.display)
+        cv2.cvtColor(self.display, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self.display, self.rgb
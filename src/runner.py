@@ -0,0 +1,166 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+from src.timeline import Timeline
+
+# Created ahead of the other imports so that their cost shows up in the startup report. The game scripts import
+# this module first thing.
+startup = Timeline()
+
+from functools import partial
+from absl import app, flags
+import cv2
+import sys
+import time
+import multiprocessing as _mp
+from src.capture import FrameRecorder
+from src.detector import INTERPOLATIONS
+from src.backends import BACKENDS
+from src.tracker import HandTracker, REDETECT_POLICIES
+from src.channel import ActionChannel
+from src.scheduler import GAME_PACINGS
+from src.startup import start_detection
+from src.preprocess import FramePreprocessor
+from src.allocations import AllocationCounter
+from src.overlay import ZoneOverlay
+from src.display import PreviewWindow
+from src.cpu import parse_cpus, set_affinity, set_cv_threads
+from src.config import RED, GREEN
+
+flags.DEFINE_integer("width", 640, "Screen width")
+flags.DEFINE_integer("height", 480, "Screen height")
+flags.DEFINE_float("threshold", 0.6, "Threshold for score")
+flags.DEFINE_string("pre_trained_model_path", "src/pretrained_model.pb", "Path to pre-trained model")
+flags.DEFINE_string("replay", None, "Directory of a recording to replay instead of reading the camera")
+flags.DEFINE_boolean("replay_realtime", True, "Replay at the recorded pace instead of as fast as possible")
+flags.DEFINE_string("record", None, "Directory to record captured frames to")
+flags.DEFINE_integer("record_max_frames", 9000, "Maximum number of recorded frames")
+flags.DEFINE_integer("input_width", 0, "Width frames are downscaled to before detection, 0 keeps the frame size")
+flags.DEFINE_integer("input_height", 0, "Height frames are downscaled to before detection")
+flags.DEFINE_enum("interpolation", "area", list(INTERPOLATIONS), "Interpolation used for downscaling")
+flags.DEFINE_enum("backend", "tensorflow", list(BACKENDS), "Inference backend, the model path has to match it")
+flags.DEFINE_integer("detect_every", 1, "Run the detector every N frames and track hands in between")
+flags.DEFINE_enum("redetect_policy", "both", REDETECT_POLICIES,
+                  "Re-run the detector on interval, on low tracking confidence or on both")
+flags.DEFINE_float("track_confidence", 0.5, "Share of tracked points below which tracking is considered lost")
+flags.DEFINE_float("motion_threshold", 0, "Mean gray level change under which the previous results are reused, "
+                                          "0 analyses every frame")
+flags.DEFINE_integer("max_reuse", 15, "Maximum number of consecutive frames reusing previous results")
+flags.DEFINE_boolean("pipeline", False, "Run capture, inference and rendering as parallel stages, needs Python 3.8+")
+flags.DEFINE_integer("pipeline_slots", 4, "Number of shared frame buffers in pipeline mode")
+flags.DEFINE_integer("intra_op_threads", 0, "Threads TensorFlow uses within an operation, 0 for one per core")
+flags.DEFINE_integer("inter_op_threads", 0, "Threads TensorFlow runs independent operations on, 0 for one per core")
+flags.DEFINE_integer("cv_threads", -1, "Threads OpenCV uses, 0 disables its thread pool and -1 keeps its default")
+flags.DEFINE_string("main_cpus", "", "CPUs the detection and rendering processes run on, like 0-2, empty for all")
+flags.DEFINE_string("game_cpus", "", "CPUs the game process runs on, like 3, empty for all")
+flags.DEFINE_boolean("count_allocations", False, "Trace memory allocated per frame, slows everything down")
+flags.DEFINE_boolean("headless", False, "Run without the preview window, Ctrl+C stops")
+flags.DEFINE_integer("preview_fps", 30, "Rate the preview window is refreshed at")
+flags.DEFINE_float("action_max_age", 0, "Seconds after which the game stops playing the last action if no newer "
+                                       "one came, 0 keeps it until the next one")
+
+FLAGS = flags.FLAGS
+
+
+def main(game, layout, _):
+    startup.mark("imports")
+    mp = _mp.get_context("spawn")
+    src = FLAGS.replay if FLAGS.replay else 0
+    recorder = FrameRecorder(FLAGS.record, FLAGS.record_max_frames) if FLAGS.record else None
+    detector_options = {"input_size": (FLAGS.input_width, FLAGS.input_height) if FLAGS.input_width else None,
+                        "interpolation": FLAGS.interpolation, "intra_op_threads": FLAGS.intra_op_threads,
+                        "inter_op_threads": FLAGS.inter_op_threads, "backend": FLAGS.backend}
+    tracker_options = {"detect_every": FLAGS.detect_every, "policy": FLAGS.redetect_policy,
+                       "min_confidence": FLAGS.track_confidence, "motion_threshold": FLAGS.motion_threshold,
+                       "max_reuse": FLAGS.max_reuse}
+    # The game does not depend on the detector, it gets going while the model loads. It is spawned before the main
+    # process gets pinned, otherwise it would inherit --main_cpus when --game_cpus is empty
+    channel = ActionChannel(mp)
+    channel.latency.report_on_signal()
+    pacing = FLAGS.game_pacing if "game_pacing" in FLAGS else "frame"
+    process = mp.Process(target=game, args=(channel, time.time(), FLAGS.action_max_age, pacing))
+    process.start()
+    set_affinity(parse_cpus(FLAGS.game_cpus), process.pid)
+    startup.mark("game spawned")
+    # Processes started from here on, pipeline stages included, inherit the affinity of the main process
+    set_affinity(parse_cpus(FLAGS.main_cpus))
+    set_cv_threads(FLAGS.cv_threads)
+    if FLAGS.pipeline:
+        # Imported here, the shared memory of the pipeline needs Python 3.8 while TensorFlow 1 stops at 3.7
+        from src.pipeline import Pipeline
+        pipeline = Pipeline(mp, src, FLAGS.pre_trained_model_path, FLAGS.threshold, FLAGS.width, FLAGS.height,
+                            FLAGS.pipeline_slots, FLAGS.replay_realtime, recorder, detector_options,
+                            tracker_options, FLAGS.cv_threads).start()
+        startup.mark("pipeline started")
+    else:
+        detector, stream = start_detection(FLAGS.pre_trained_model_path, src, FLAGS.width, FLAGS.height,
+                                           FLAGS.replay_realtime, recorder, detector_options, startup)
+        tracker = HandTracker(detector, FLAGS.threshold, FLAGS.width, FLAGS.height, **tracker_options)
+    preprocessor = FramePreprocessor()
+    allocations = AllocationCounter(FLAGS.count_allocations)
+    zone_map = layout.compile(FLAGS.width, FLAGS.height)
+    zones = ZoneOverlay(layout.draw, FLAGS.alpha)
+    preview = PreviewWindow('Detection', FLAGS.preview_fps, FLAGS.headless)
+    num_frames = 0
+    start = time.time()
+    while not preview.quit:
+        allocations.start_frame()
+        if FLAGS.pipeline:
+            slot, _, timestamp, frame, results = pipeline.get()
+            if frame is None:
+                break
+        else:
+            _, timestamp, frame = stream.read()
+            if frame is None:
+                break
+            frame, rgb = preprocessor.process(frame)
+            results = tracker.update(rgb)
+
+        # Zones go under the marker and the text
+        zones.apply(frame)
+        if len(results) == 1:
+            x_min, x_max, y_min, y_max, class_id, score, x, y = results[0].tolist()
+            cv2.circle(frame, (x, y), 5, RED, -1)
+            action, text = zone_map.action(class_id, x, y)
+            channel.publish(action, timestamp, score)
+            cv2.putText(frame, "{}".format(text), (x_min, y_min - 5),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, GREEN, 2)
+        preview.show(frame)
+        allocations.end_frame()
+        if FLAGS.pipeline:
+            pipeline.done(slot)
+        num_frames += 1
+        if num_frames == 1:
+            startup.mark("first frame")
+            print(startup.report())
+
+    print("Effective FPS: {:.1f}".format(num_frames / (time.time() - start)))
+    print(channel.latency.report())
+    if FLAGS.count_allocations:
+        print("Allocations: {}".format(allocations.report(FLAGS.width * FLAGS.height * 3)))
+        allocations.stop()
+    if FLAGS.pipeline:
+        pipeline.stop()
+        print("Mean queue depth: {}".format(pipeline.report()))
+    else:
+        stream.release()
+        detector.close()
+        print("Dropped frames: {}".format(stream.dropped))
+        print("Detector ran on {}/{} frames, {} static frames reused previous results".format(
+            tracker.detections, tracker.frames, tracker.reused))
+    preview.close()
+
+
+def run(game, layout, alpha, paced=True):
+    """ Run detection and drive game, a function of src.games, through the actions of layout
+    alpha is the default transparency of the zones, the only flag whose default differs between games. paced is
+    False for games that keep their own pace, which then have no --game_pacing flag.
+    """
+    flags.DEFINE_float("alpha", alpha, "Transparent level")
+    if paced:
+        flags.DEFINE_enum("game_pacing", "frame", GAME_PACINGS, "Step the game on a schedule at its native rate, or "
+                          "poll with a fixed sleep to compare, only for Mario and the dinosaur")
+    # --help lists the flags of the script being run, which are all defined here
+    for flag in flags.FLAGS.get_key_flags_for_module(__name__):
+        flags.FLAGS.register_key_flag_for_module(sys.argv[0], flag)
+    app.run(partial(main, game, layout))
@@ -0,0 +1,95 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import time
+import numpy as np
+
+NES_FRAME_RATE = 60.0988
+CHROME_DINO_FRAME_RATE = 60
+GAME_PACINGS = ["frame", "poll"]
+
+
+class FrameScheduler(object):
+    """ Paces a game loop at a fixed rate
+    Deadlines are absolute, so the time spent stepping and rendering does not add up into drift the way a fixed
+    sleep after every step does. A loop running more than a frame late skips the missed deadlines instead of running
+    them back to back. With wake, a callable taking a timeout like ActionChannel.wait, the loop can also be woken
+    before the deadline, the next deadline then being a full frame after the wake-up.
+    """
+
+    def __init__(self, rate, wake=None):
+        self.period = 1.0 / rate
+        self.wake = wake
+        self.deadline = None
+        self.skipped = 0
+
+    def wait(self):
+        """ Block until the next frame is due
+        @return True when woken before the deadline
+        """
+        now = time.time()
+        if self.deadline is None:
+            self.deadline = now
+        elif now - self.deadline > self.period:
+            self.skipped += int((now - self.deadline) / self.period)
+            self.deadline = now
+        woken = False
+        remaining = self.deadline - now
+        if remaining > 0:
+            if self.wake is not None:
+                woken = self.wake(remaining)
+            else:
+                time.sleep(remaining)
+        if woken:
+            self.deadline = time.time()
+        self.deadline += self.period
+        return woken
+
+
+class StepStats(object):
+    """ Step rate, interval jitter and action-to-step latency of a game loop, printed every report_every seconds
+    Latency runs from the moment the detection process publishes an action to the first step that plays it. The
+    time from the capture of the frame to that step goes into histogram, the one of the channel, for the detection
+    process to report. step() takes what ActionChannel.current() returned as played and is meant to be called right
+    before the game acts on the action.
+    """
+
+    def __init__(self, name, histogram=None, report_every=10):
+        self.name = name
+        self.histogram = histogram
+        self.report_every = report_every
+        self.last_step = None
+        self.last_count = 0
+        self.intervals = []
+        self.latencies = []
+        self.last_report = time.time()
+
+    def step(self, played):
+        now = time.time()
+        if self.last_step is not None:
+            self.intervals.append(now - self.last_step)
+        self.last_step = now
+        # Nothing is recorded for steps playing the default action, stale and reset actions included
+        if played is not None and played[0] != self.last_count:
+            count, timestamp, published = played
+            self.latencies.append(now - published)
+            if self.histogram is not None:
+                self.histogram.add(now - timestamp)
+            self.last_count = count
+        if now - self.last_report >= self.report_every:
+            print(self.report())
+            self.intervals = []
+            self.latencies = []
+            self.last_report = now
+
+    def report(self):
+        intervals = np.array(self.intervals) * 1000
+        latencies = np.array(self.latencies) * 1000
+        line = "{}: {:.1f} steps/s".format(self.name, 1000 / intervals.mean() if len(intervals) else 0)
+        if len(intervals):
+            line += ", interval jitter {:.2f} ms std, p95 {:.1f} ms".format(intervals.std(),
+                                                                          np.percentile(intervals, 95))
+        if len(latencies):
+            line += ", action to step p50 {:.1f} ms, p95 {:.1f} ms".format(np.percentile(latencies, 50),
+                                                                         np.percentile(latencies, 95))
+        return line
@@ -0,0 +1,51 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import threading
+from src.capture import VideoStream
+from src.detector import HandDetector
+
+
+def load_detector(path, width, height, detector_options, timeline):
+    detector = HandDetector(path, **detector_options)
+    timeline.mark("model loaded")
+    # The first session run allocates and initializes everything lazily, better pay for it before the first frame
+    detector.warmup(width, height)
+    timeline.mark("warm-up inference done")
+    return detector
+
+
+def open_stream(src, width, height, realtime, recorder, timeline):
+    stream = VideoStream(src, width, height, realtime, recorder).start()
+    timeline.mark("camera opened")
+    return stream
+
+
+def start_detection(path, src, width, height, realtime, recorder, detector_options, timeline):
+    """ Load and warm up the detector while the camera is being opened
+    Both mostly wait on native code that releases the GIL, so running them on two threads takes about as long as
+    the slower of the two instead of their sum.
+    @return (HandDetector, started VideoStream)
+    """
+    results = {}
+    errors = []
+
+    def run(name, function, *args):
+        try:
+            results[name] = function(*args)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, name="model",
+                                args=("detector", load_detector, path, width, height, detector_options, timeline)),
+               threading.Thread(target=run, name="camera",
+                                args=("stream", open_stream, src, width, height, realtime, recorder, timeline))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        if "stream" in results:
+            results["stream"].release()
+        raise errors[0]
+    return results["detector"], results["stream"]
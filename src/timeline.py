@@ -0,0 +1,32 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import threading
+import time
+
+
+class Timeline(object):
+    """ Records when startup milestones are reached, relative to the creation of the timeline
+    Milestones can be marked from several threads. Each one is reported with the thread that reached it and the
+    time elapsed since the previous milestone of that same thread, so overlapping steps keep their own durations.
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.events = []
+        self.lock = threading.Lock()
+
+    def mark(self, label):
+        with self.lock:
+            self.events.append((time.time(), threading.current_thread().name, label))
+
+    def report(self):
+        lines = ["Startup timeline:"]
+        previous = {}
+        with self.lock:
+            events = sorted(self.events)
+        for timestamp, thread, label in events:
+            lines.append("  {:>7.2f}s  (+{:.2f}s)  [{}] {}".format(
+                timestamp - self.start, timestamp - previous.get(thread, self.start), thread, label))
+            previous[thread] = timestamp
+        return "\n".join(lines)
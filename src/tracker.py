@@ -0,0 +1,129 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+import cv2
+import numpy as np
+from src.motion import MotionGate
+from src.utils import predict_array
+
+REDETECT_POLICIES = ["interval", "confidence", "both"]
+
+
+def create_kalman_filter(x, y):
+    # Constant velocity model on the hand centroid
+    kalman = cv2.KalmanFilter(4, 2)
+    kalman.transitionMatrix = np.array([[1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0], [0, 0, 0, 1]], np.float32)
+    kalman.measurementMatrix = np.array([[1, 0, 0, 0], [0, 1, 0, 0]], np.float32)
+    kalman.processNoiseCov = np.eye(4, dtype=np.float32)
+    kalman.measurementNoiseCov = np.eye(2, dtype=np.float32) * 4
+    kalman.statePost = np.array([[x], [y], [0], [0]], np.float32)
+    return kalman
+
+
+class HandTracker(object):
+    """ Runs the detector only every few frames and tracks the hands in between
+    Boxes are moved by the median Lucas-Kanade optical flow of corners found inside them, and centroids are
+    smoothed by a Kalman filter. The gesture class is the one of the last detection. Depending on the policy,
+    the detector runs again every detect_every frames ("interval"), when the share of corners still tracked falls
+    below min_confidence ("confidence"), or on whichever comes first ("both").
+    Frames a MotionGate built from motion_threshold and max_reuse finds static are not analysed at all, the
+    previous hands are returned as they are.
+    """
+
+    def __init__(self, detector, threshold, width, height, detect_every=1, policy="both", min_confidence=0.5,
+                 motion_threshold=0, max_reuse=15):
+        self.detector = detector
+        self.threshold = threshold
+        self.width = width
+        self.height = height
+        self.detect_every = detect_every
+        self.policy = policy
+        self.min_confidence = min_confidence
+        self.gate = MotionGate(motion_threshold, max_reuse)
+        self.hands = None
+        self.boxes = None
+        self.points = []
+        self.kalman_filters = []
+        self.confidence = 0.0
+        self.prev_gray = None
+        self.since_detection = 0
+        self.frames = 0
+        self.detections = 0
+        self.reused = 0
+
+    def need_detection(self):
+        if self.hands is None or self.detect_every <= 1:
+            return True
+        interval_due = self.since_detection >= self.detect_every
+        confidence_low = self.confidence < self.min_confidence
+        if self.policy == "interval":
+            return interval_due
+        elif self.policy == "confidence":
+            return confidence_low
+        return interval_due or confidence_low
+
+    def update(self, image):
+        """ Locate hands on an RGB frame
+        @return structured array of HAND_DTYPE, like predict_array
+        """
+        self.frames += 1
+        if self.gate.is_static(image):
+            self.reused += 1
+            return self.hands
+        if self.need_detection():
+            self.detect(image)
+        else:
+            self.track(image)
+        return self.hands
+
+    def detect(self, image):
+        boxes, scores, classes = self.detector.detect(image)
+        self.hands = predict_array(boxes, scores, classes, self.threshold, self.width, self.height)
+        self.detections += 1
+        self.since_detection = 1
+        self.confidence = 1.0 if len(self.hands) else 0.0
+        if self.detect_every <= 1:
+            return
+        self.prev_gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        # Boxes are moved in float so that sub-pixel flow does not get truncated away frame after frame
+        self.boxes = np.stack([self.hands["x_min"], self.hands["x_max"], self.hands["y_min"], self.hands["y_max"]],
+                              axis=1).astype(np.float32)
+        self.points = []
+        self.kalman_filters = []
+        for hand in self.hands:
+            mask = np.zeros_like(self.prev_gray)
+            mask[hand["y_min"]:hand["y_max"], hand["x_min"]:hand["x_max"]] = 255
+            points = cv2.goodFeaturesToTrack(self.prev_gray, maxCorners=30, qualityLevel=0.01, minDistance=5,
+                                             mask=mask)
+            self.points.append(points)
+            self.kalman_filters.append(create_kalman_filter(hand["x"], hand["y"]))
+
+    def track(self, image):
+        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+        self.since_detection += 1
+        confidences = []
+        for index, hand in enumerate(self.hands):
+            points = self.points[index]
+            if points is None or len(points) == 0:
+                confidences.append(0.0)
+                continue
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None)
+            good = status.ravel() == 1
+            confidences.append(good.mean())
+            if not good.any():
+                self.points[index] = None
+                continue
+            dx, dy = np.median(new_points[good] - points[good], axis=0).ravel()
+            box = self.boxes[index]
+            box += (dx, dx, dy, dy)
+            np.clip(box, 0, (self.width, self.width, self.height, self.height), out=box)
+            hand["x_min"], hand["x_max"], hand["y_min"], hand["y_max"] = box
+            kalman = self.kalman_filters[index]
+            kalman.predict()
+            centroid = np.array([[(box[0] + box[1]) / 2], [(box[2] + box[3]) / 2]], np.float32)
+            x, y = kalman.correct(centroid)[:2].ravel()
+            hand["x"] = np.clip(x, 0, self.width)
+            hand["y"] = np.clip(y, 0, self.height)
+            self.points[index] = new_points[good].reshape(-1, 1, 2)
+        self.confidence = min(confidences) if confidences else 0.0
+        self.prev_gray = gray
@@ -1,38 +1,52 @@
 """
 @author: Viet Nguyen <nhviet1009@gmail.com>
 """
+import os
 import numpy as np
-from nes_py.wrappers import JoypadSpace
-import gym
-import gym_super_mario_bros
-from gym_super_mario_bros.actions import COMPLEX_MOVEMENT
-from gym_chrome_dino.utils.wrappers import make_dino
-import tensorflow as tf
-from time import sleep
 from src.config import HAND_GESTURES
 
+MEMMAPPED_GRAPH = "graph.pb"
+# Output nodes of the frozen graph, the ones graph rewrites have to keep
+DETECTION_OUTPUTS = ["detection_boxes", "detection_scores", "detection_classes"]
 
-def is_in_triangle(point, triangle):
-    # barycentric coordinate system
-    x, y = point
-    (xa, ya), (xb, yb), (xc, yc) = triangle
-    a = ((yb - yc)*(x - xc) + (xc - xb)*(y - yc)) / ((yb - yc)*(xa - xc) + (xc - xb)*(ya - yc))
-    b = ((yc - ya) * (x - xc) + (xa - xc) * (y - yc)) / ((yb - yc) * (xa - xc) + (xc - xb) * (ya - yc))
-    c = 1 - a - b
-    if 0 <= a <= 1 and 0 <= b <= 1 and 0 <= c <= 1:
-        return True
-    else:
-        return False
 
+def read_graph_def(path):
+    # TensorFlow is imported lazily in every graph helper, see load_graph
+    import tensorflow as tf
+    graph_def = tf.GraphDef()
+    with tf.gfile.GFile(path, 'rb') as fid:
+        graph_def.ParseFromString(fid.read())
+    return graph_def
 
-def load_graph(path):
+
+def write_graph_def(graph_def, path):
+    import tensorflow as tf
+    with tf.gfile.GFile(path, 'wb') as fid:
+        fid.write(graph_def.SerializeToString())
+
+
+def load_graph(path, intra_op_threads=0, inter_op_threads=0):
+    """ Load a frozen graph from a .pb file, the quantized one written by quantize_graph.py included, or a
+    memory-mapped model directory written by memmap_model.py
+    The thread counts size the session thread pools, 0 lets TensorFlow use one thread per core for each.
+    """
+    # Imported here so that processes which never run the detector, like the game processes, do not load TensorFlow
+    import tensorflow as tf
     detection_graph = tf.Graph()
     with detection_graph.as_default():
-        graph_def = tf.GraphDef()
-        with tf.gfile.GFile(path, 'rb') as fid:
-            graph_def.ParseFromString(fid.read())
+        if os.path.isdir(path):
+            graph_def = read_graph_def(os.path.join(path, MEMMAPPED_GRAPH))
+            # Weights are ImmutableConst nodes naming their raw file, which TensorFlow maps instead of reading
+            for node in graph_def.node:
+                if node.op == "ImmutableConst":
+                    region = node.attr["memory_region_name"].s.decode()
+                    node.attr["memory_region_name"].s = os.path.abspath(os.path.join(path, region)).encode()
             tf.import_graph_def(graph_def, name='')
-        sess = tf.Session(graph=detection_graph)
+        else:
+            tf.import_graph_def(read_graph_def(path), name='')
+        config = tf.ConfigProto(intra_op_parallelism_threads=intra_op_threads,
+                                inter_op_parallelism_threads=inter_op_threads)
+        sess = tf.Session(graph=detection_graph, config=config)
     return detection_graph, sess
 
 
@@ -47,45 +61,32 @@ def detect_hands(image, graph, sess):
     return np.squeeze(boxes), np.squeeze(scores), np.squeeze(classes)
 
 
-def predict(boxes, scores, classes, threshold, width, height, num_hands=2):
-    count = 0
-    results = {}
-    for box, score, class_ in zip(boxes[:num_hands], scores[:num_hands], classes[:num_hands]):
-        if score > threshold:
-            y_min = int(box[0] * height)
-            x_min = int(box[1] * width)
-            y_max = int(box[2] * height)
-            x_max = int(box[3] * width)
-            category = HAND_GESTURES[int(class_) - 1]
-            results[count] = [x_min, x_max, y_min, y_max, category]
-            count += 1
-    return results
+HAND_DTYPE = np.dtype([("x_min", np.int32), ("x_max", np.int32), ("y_min", np.int32), ("y_max", np.int32),
+                       ("class_id", np.int32), ("score", np.float32), ("x", np.int32), ("y", np.int32)])
+
 
+def predict_array(boxes, scores, classes, threshold, width, height, num_hands=2):
+    """ Vectorized prediction
+    @return structured array of HAND_DTYPE with one record per hand above threshold, x and y being the centroid
+    """
+    keep = scores[:num_hands] > threshold
+    # Boxes can reach slightly past the frame, whatever the backend, and centroids have to index the zone labels
+    kept_boxes = np.clip(boxes[:num_hands][keep], 0, 1)
+    hands = np.empty(len(kept_boxes), dtype=HAND_DTYPE)
+    hands["y_min"] = kept_boxes[:, 0] * height
+    hands["x_min"] = kept_boxes[:, 1] * width
+    hands["y_max"] = kept_boxes[:, 2] * height
+    hands["x_max"] = kept_boxes[:, 3] * width
+    hands["class_id"] = classes[:num_hands][keep]
+    hands["score"] = scores[:num_hands][keep]
+    hands["x"] = (hands["x_min"] + hands["x_max"]) // 2
+    hands["y"] = (hands["y_min"] + hands["y_max"]) // 2
+    return hands
 
-def mario(v, lock):
-    env = gym_super_mario_bros.make('SuperMarioBros-1-1-v0')
-    env = JoypadSpace(env, COMPLEX_MOVEMENT)
-    done = True
-    while True:
-        if done:
-            env.reset()
-            with lock:
-                v.value = 0
-        with lock:
-            u = v.value
-        _, _, done, _ = env.step(u)
-        env.render()
-        sleep(0.01)
 
-def dinosaur(v,lock):
-    env = gym.make('ChromeDino-v0')
-    env = make_dino(env, timer=True, frame_stack=True)
-    done = True
-    while True:
-        if done:
-            env.reset()
-            with lock:
-                v.value = 0
-        with lock:
-            u = v.value
-        _, _, done, _ = env.step(u)
+def predict(boxes, scores, classes, threshold, width, height, num_hands=2):
+    results = {}
+    for count, (x_min, x_max, y_min, y_max, class_id, _, _, _) in enumerate(
+            predict_array(boxes, scores, classes, threshold, width, height, num_hands).tolist()):
+        results[count] = [x_min, x_max, y_min, y_max, HAND_GESTURES[class_id - 1]]
+    return results
@@ -0,0 +1,92 @@
+"""
+@author: Viet Nguyen <nhviet1009@gmail.com>
+"""
+from collections import namedtuple
+import numpy as np
+from src.config import HAND_GESTURES
+
+# A zone of the screen and what each gesture does inside it, as {gesture: (action, text)}. Shapes are given in
+# fractions of the frame size: "rect" as (x_min, y_min, x_max, y_max), "triangle" as three (x, y) corners and
+# "circle" as (x, y, radius), the radius being a fraction of the smaller side. color is None for zones that are
+# not drawn.
+Zone = namedtuple("Zone", ["shape", "geometry", "color", "actions"])
+
+
+def zone_mask(zone, xs, ys, width, height):
+    if zone.shape == "rect":
+        x_min, y_min, x_max, y_max = zone.geometry
+        return (x_min * width <= xs) & (xs <= x_max * width) & (y_min * height <= ys) & (ys <= y_max * height)
+    elif zone.shape == "triangle":
+        # Barycentric coordinates, on corners rounded down to whole pixels
+        (xa, ya), (xb, yb), (xc, yc) = ((int(x * width), int(y * height)) for x, y in zone.geometry)
+        denominator = (yb - yc) * (xa - xc) + (xc - xb) * (ya - yc)
+        a = ((yb - yc) * (xs - xc) + (xc - xb) * (ys - yc)) / denominator
+        b = ((yc - ya) * (xs - xc) + (xa - xc) * (ys - yc)) / denominator
+        c = 1 - a - b
+        return (0 <= a) & (a <= 1) & (0 <= b) & (b <= 1) & (0 <= c) & (c <= 1)
+    elif zone.shape == "circle":
+        x, y, radius = zone.geometry
+        return np.hypot(xs - int(x * width), ys - int(y * height)) <= int(radius * min(width, height))
+    raise ValueError("Unknown zone shape {}".format(zone.shape))
+
+
+class ZoneMap(object):
+    """ A ZoneLayout compiled for one frame size
+    labels holds, for every pixel coordinate up to width and height included, the index of the zone it falls in
+    plus one, 0 being outside every zone. actions and texts are tables indexed by label and class id - 1, so
+    mapping a hand to its action is one array lookup.
+    """
+
+    def __init__(self, labels, actions, texts, colors):
+        self.labels = labels
+        self.actions = actions
+        self.texts = texts
+        self.colors = colors
+
+    def lookup(self, class_ids, xs, ys):
+        """ Vectorized action lookup for many hands
+        @return (actions, labels) as arrays, texts[labels, class_ids - 1] gives the texts
+        """
+        labels = self.labels[ys, xs]
+        return self.actions[labels, np.asarray(class_ids) - 1], labels
+
+    def action(self, class_id, x, y):
+        label = self.labels[y, x]
+        return int(self.actions[label, class_id - 1]), self.texts[label, class_id - 1]
+
+
+class ZoneLayout(object):
+    """ Declarative screen layout of a game: zones and the action every gesture triggers in them
+    Where zones overlap the first one listed wins, like an if/elif chain. default gives the action of each gesture
+    outside every zone and inside zones that do not list that gesture. Layouts are compiled into a ZoneMap once per
+    frame size, which also paints the overlay.
+    """
+
+    def __init__(self, zones, default):
+        self.zones = zones
+        self.default = default
+        self.compiled = {}
+
+    def compile(self, width, height):
+        if (width, height) not in self.compiled:
+            ys, xs = np.mgrid[0:height + 1, 0:width + 1]
+            labels = np.zeros((height + 1, width + 1), dtype=np.uint8)
+            # Going backwards lets the first zone listed overwrite the ones after it
+            for index in range(len(self.zones) - 1, -1, -1):
+                labels[zone_mask(self.zones[index], xs, ys, width, height)] = index + 1
+            rows = [self.default] + [dict(self.default, **zone.actions) for zone in self.zones]
+            actions = np.array([[row[gesture][0] for gesture in HAND_GESTURES] for row in rows], dtype=np.int32)
+            texts = np.array([[row[gesture][1] for gesture in HAND_GESTURES] for row in rows], dtype=object)
+            colors = np.zeros((len(rows), 3), dtype=np.uint8)
+            for index, zone in enumerate(self.zones):
+                if zone.color is not None:
+                    colors[index + 1] = zone.color
+            self.compiled[(width, height)] = ZoneMap(labels, actions, texts, colors)
+        return self.compiled[(width, height)]
+
+    def draw(self, image, width, height):
+        """ Paint the zones that have a color onto an image of the given size, for ZoneOverlay """
+        zone_map = self.compile(width, height)
+        colors = zone_map.colors[zone_map.labels[:height, :width]]
+        drawn = colors.any(axis=2)
+        image[drawn] = colors[drawn]